@@ -0,0 +1,119 @@
+# ai/src/bench_inference.py
+"""
+CPU benchmark of NL->SQL generation: the previous one-query-at-a-time path padded to
+max_length against SQLTrainer.generate_sql_batch at several batch sizes.
+
+    python ai/src/bench_inference.py --queries 128 --batch-sizes 1,2,4,8,16,32,64
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import time
+
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+from config.model_config import ModelConfig
+from trainer.sql_trainer import SQLTrainer
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'query_dataset.json')
+
+
+def parse_arguments():
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser(description='Benchmark batched SQL generation on CPU')
+    parser.add_argument('--model-dir', type=str, default=None,
+                      help='Directory of a saved model (default: config.output_dir if present, else the base model)')
+    parser.add_argument('--queries', type=int, default=128,
+                      help='Number of prompts sampled from query_dataset.json')
+    parser.add_argument('--batch-sizes', type=str, default='1,2,4,8,16,32,64',
+                      help='Comma separated batch sizes')
+    parser.add_argument('--threads', type=int, default=None,
+                      help='torch CPU threads (default: torch default)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for sampling prompts')
+    return parser.parse_args()
+
+
+def load_prompts(count, seed):
+    with open(DATASET_PATH, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)["dataset"]
+    random.Random(seed).shuffle(dataset)
+    return [item["input"] for item in dataset[:count]]
+
+
+def generate_padded(trainer, input_text):
+    """Previous generate_sql: one prompt padded to max_length"""
+    inputs = trainer.tokenizer(
+        trainer.input_prefix + input_text,
+        max_length=trainer.config.max_length,
+        padding="max_length",
+        truncation=True,
+        return_tensors="pt"
+    ).to(trainer.device)
+    with torch.inference_mode():
+        outputs = trainer.model.generate(
+            input_ids=inputs["input_ids"],
+            attention_mask=inputs["attention_mask"],
+            max_length=trainer.config.max_length,
+            num_beams=trainer.config.num_beams,
+            early_stopping=True
+        )
+    return trainer.tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+
+def report(label, elapsed, queries, batch_size):
+    # Every query in a batch waits for the whole batch
+    latency_ms = elapsed / queries * batch_size * 1000
+    print(f"{label:<28} {latency_ms:>16.1f} {queries / elapsed:>12.2f}")
+
+
+def main():
+    args = parse_arguments()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    config = ModelConfig()
+    trainer = SQLTrainer(config)
+    model_dir = args.model_dir or config.output_dir
+    if os.path.exists(os.path.join(model_dir, "model")):
+        trainer.load_model(model_dir)
+        trainer.model.to(trainer.device)
+    else:
+        print(f"No saved model in {model_dir}, using base {config.model_name}")
+    trainer.model.eval()
+
+    prompts = load_prompts(args.queries, args.seed)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    print(f"{len(prompts)} prompts, device {trainer.device}, {torch.get_num_threads()} threads")
+
+    # Warm up
+    trainer.generate_sql_batch(prompts[:2])
+
+    print()
+    print(f"{'mode':<28} {'latency/query (ms)':>16} {'queries/s':>12}")
+    print("-" * 58)
+
+    started = time.perf_counter()
+    baseline = [generate_padded(trainer, prompt) for prompt in prompts]
+    report("padded to max_length, b=1", time.perf_counter() - started, len(prompts), 1)
+
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        results = trainer.generate_sql_batch(prompts, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        mismatches = sum(a != b for a, b in zip(baseline, results))
+        report(f"dynamic padding, b={batch_size}", elapsed, len(prompts), batch_size)
+        if mismatches:
+            print(f"{'':<28} {mismatches} outputs differ from the padded baseline")
+
+
+if __name__ == "__main__":
+    main()
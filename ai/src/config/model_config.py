@@ -22,4 +22,13 @@ class ModelConfig:
     checkpoint_dir: str = os.path.join(base_dir, "outputs", "checkpoints")
     logging_steps: int = 10
     save_strategy: str = "epoch"
-    eval_strategy: str = "epoch"
\ No newline at end of file
+    eval_strategy: str = "epoch"
+    num_beams: int = 4
+    inference_batch_size: int = 16
+    batch_wait_ms: float = 5.0
+    db_workers: int = 4
+    translation_cache_size: int = 1024
+    translation_cache_ttl: float = 3600.0
+    use_template_router: bool = True
+    result_cache_mb: int = 64
+    watermark_ttl: float = 1.0
\ No newline at end of file
@@ -15,7 +15,9 @@ def main():
         "user": "root",       # 사용자 이름
         "password": "",  # 비밀번호
         "database": "iotlogs",  # 데이터베이스 이름
-        "port": 3306          # 포트
+        "port": 3306,         # 포트
+        "id_storage": os.environ.get("IOT_ID_STORAGE", "hex"),  # ID 저장 방식 (hex/binary)
+        "database_url": os.environ.get("IOT_DATABASE_URL")     # 설정 시 MySQL 대신 사용 (예: sqlite:///iotlogs.db)
     }
 
     try:
@@ -9,12 +9,14 @@ import sys
 from datetime import datetime
 import pandas as pd
 import json
+from functools import partial
 
 # 프로젝트 루트 경로 설정
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 sys.path.append(PROJECT_ROOT)
 
 from utils.sql_assistant import SQLAssistant
+from utils.batch_scheduler import BatchScheduler
 
 app = FastAPI(
     title="AI SQL Query API",
@@ -37,7 +39,13 @@ DB_CONFIG = {
     "user": "root",
     "password": "",
     "database": "iotlogs",
-    "port": 3306
+    "port": 3306,
+    # backend와 동일한 ID 저장 방식 ('hex' 또는 'binary')
+    "id_storage": os.environ.get("IOT_ID_STORAGE", "hex"),
+    # 집계 쿼리를 usage_rollups 테이블에서 처리할지 여부
+    "use_rollups": os.environ.get("IOT_USE_ROLLUPS", "1") == "1",
+    # 설정 시 위 MySQL 접속 정보 대신 사용 (예: sqlite:///iotlogs.db, backend와 같은 값)
+    "database_url": os.environ.get("IOT_DATABASE_URL")
 }
 
 # 요청 모델
@@ -54,6 +62,8 @@ class QueryResponse(BaseModel):
 
 # SQLAssistant 인스턴스 저장
 sql_assistant: Optional[SQLAssistant] = None
+# 동시 요청을 모아 배치 생성하는 스케줄러
+batch_scheduler: Optional[BatchScheduler] = None
 
 def get_sql_assistant() -> SQLAssistant:
     """SQLAssistant 인스턴스를 가져오거나 생성"""
@@ -63,6 +73,23 @@ def get_sql_assistant() -> SQLAssistant:
         sql_assistant = SQLAssistant(**DB_CONFIG)
     return sql_assistant
 
+def get_batch_scheduler() -> BatchScheduler:
+    """BatchScheduler 인스턴스를 가져오거나 생성 (이벤트 루프 안에서 호출)"""
+    global batch_scheduler
+    if batch_scheduler is None:
+        assistant = get_sql_assistant()
+        config = assistant.config
+        # 템플릿/변환 캐시로 답할 수 있는 요청은 큐에 넣지 않고, 큐에 들어온 miss는 캐시를 다시 보지 않음
+        batch_scheduler = BatchScheduler(
+            partial(assistant.generate_sql_batch, use_cache=False),
+            assistant.execute_sql,
+            max_batch=config.inference_batch_size,
+            max_wait_ms=config.batch_wait_ms,
+            db_workers=config.db_workers,
+            fast_path=assistant.lookup_sql
+        ).start()
+    return batch_scheduler
+
 def convert_dataframe_to_dict(df: pd.DataFrame) -> Dict[str, Any]:
     """DataFrame을 JSON 직렬화 가능한 딕셔너리로 변환"""
     if df is None:
@@ -79,10 +106,10 @@ def convert_dataframe_to_dict(df: pd.DataFrame) -> Dict[str, Any]:
 async def process_query(request: QueryRequest):
     """자연어 쿼리를 처리하고 SQL을 실행"""
     try:
-        assistant = get_sql_assistant()
+        scheduler = get_batch_scheduler()
         
-        # 쿼리 처리 및 실행
-        sql, results = assistant.process_query(request.query, request.execute)
+        # 쿼리 처리 및 실행 (생성은 배치 스케줄러, 실행은 DB 스레드 풀에서 처리)
+        sql = await scheduler.generate(request.query)
         
         if sql is None:
             raise HTTPException(
@@ -90,6 +117,8 @@ async def process_query(request: QueryRequest):
                 detail="Failed to process query"
             )
         
+        results = await scheduler.execute(sql) if request.execute else None
+        
         # DataFrame 결과를 딕셔너리로 변환
         formatted_results = None
         if isinstance(results, pd.DataFrame):
@@ -110,14 +139,18 @@ async def health_check():
     """API 상태 확인"""
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "batching": batch_scheduler.stats() if batch_scheduler else None,
+        "translation_cache": sql_assistant.translation_cache.stats() if sql_assistant else None,
+        "template_router": sql_assistant.template_router.stats() if sql_assistant and sql_assistant.template_router else None,
+        "result_cache": sql_assistant.executor.result_cache.stats() if sql_assistant and sql_assistant.executor.result_cache else None
     }
 
 @app.on_event("startup")
 async def startup_event():
     """애플리케이션 시작 시 실행"""
     try:
-        get_sql_assistant()
+        get_batch_scheduler()
     except Exception as e:
         print(f"Failed to initialize SQL Assistant: {e}")
         raise
@@ -125,7 +158,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 실행"""
-    global sql_assistant
+    global sql_assistant, batch_scheduler
+    if batch_scheduler:
+        await batch_scheduler.close()
+        batch_scheduler = None
     if sql_assistant:
         sql_assistant.close()
         sql_assistant = None
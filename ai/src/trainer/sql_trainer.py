@@ -19,6 +19,8 @@ class SQLTrainer:
     Trainer class for SQL translation model that handles the complete training pipeline
     including data preparation, model training, and inference.
     """
+    input_prefix = "translate English to SQL: "
+
     def __init__(self, config):
         """
         Initialize trainer with configuration.
@@ -131,25 +133,57 @@ class SQLTrainer:
         Returns:
             str: Generated SQL query
         """
-        input_text = "translate English to SQL: " + input_text
+        return self.generate_sql_batch([input_text])[0]
+
+    def generate_sql_batch(self, input_texts, batch_size=None):
+        """
+        Generate SQL queries for several inputs with one generate call per batch.
+        Inputs are grouped by token length and each batch is padded only to its
+        longest prompt, so short prompts do not pay for max_length padding.
         
-        inputs = self.tokenizer(
-            input_text,
-            max_length=self.config.max_length,
-            padding="max_length",
-            truncation=True,
-            return_tensors="pt"
-        ).to(self.device)
-        
-        outputs = self.model.generate(
-            input_ids=inputs["input_ids"],
-            attention_mask=inputs["attention_mask"],
+        Args:
+            input_texts: List of input text queries
+            batch_size: Maximum prompts per generate call (defaults to config.inference_batch_size)
+            
+        Returns:
+            list: Generated SQL queries in the order of input_texts
+        """
+        if not input_texts:
+            return []
+        batch_size = batch_size or self.config.inference_batch_size
+
+        encoded = self.tokenizer(
+            [self.input_prefix + text for text in input_texts],
             max_length=self.config.max_length,
-            num_beams=4,
-            early_stopping=True
-        )
-        
-        return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            truncation=True
+        )["input_ids"]
+
+        # Sort by length so every batch holds prompts of similar size
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+        results = [None] * len(encoded)
+
+        for start in range(0, len(order), batch_size):
+            batch_indices = order[start:start + batch_size]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [encoded[i] for i in batch_indices]},
+                padding="longest",
+                return_tensors="pt"
+            ).to(self.device)
+
+            with torch.inference_mode():
+                outputs = self.model.generate(
+                    input_ids=inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    max_length=self.config.max_length,
+                    num_beams=self.config.num_beams,
+                    early_stopping=True
+                )
+
+            decoded = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            for index, sql in zip(batch_indices, decoded):
+                results[index] = sql
+
+        return results
 
     def save_model(self, save_dir=None):
         """
@@ -0,0 +1,159 @@
+# ai/src/utils/batch_scheduler.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_DB_WORKERS = 4
+
+
+class BatchScheduler:
+    """
+    자연어 쿼리를 모아 한 번의 generate 호출로 처리하는 micro-batching 스케줄러
+
+    요청은 asyncio 큐에 쌓이고, 첫 요청 후 최대 max_wait_ms 동안(또는 max_batch개가 찰 때까지)
+    모은 뒤 모델 전용 워커 스레드에서 generate_batch를 실행합니다. 생성 중에 들어온 요청은
+    다음 배치로 모이므로 동시 요청이 많을수록 배치가 커집니다. DB 실행은 별도 스레드 풀에서 처리합니다.
+    """
+
+    def __init__(self, generate_batch, execute=None, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, db_workers=DEFAULT_DB_WORKERS, fast_path=None):
+        """
+        Args:
+            generate_batch: 자연어 쿼리 리스트를 받아 같은 순서의 SQL 리스트를 반환하는 함수
+            execute: SQL을 받아 실행 결과를 반환하는 함수 (blocking)
+            max_batch: 한 번에 생성할 최대 쿼리 수
+            max_wait_ms: 첫 요청 이후 배치를 모으는 최대 대기 시간 (ms)
+            db_workers: DB 실행 스레드 수
+            fast_path: 큐에 넣기 전에 호출할 함수 (템플릿/캐시 등; SQL을 반환하면 배치 대기와 모델을 거치지 않음)
+        """
+        self.generate_batch = generate_batch
+        self.execute_fn = execute
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.db_workers = db_workers
+        self.fast_path = fast_path
+
+        self._queue = None
+        self._worker = None
+        # 모델은 스레드 하나에서만 실행 (generate 동시 호출 방지)
+        self._model_executor = None
+        self._db_executor = None
+
+        # 통계
+        self.requests = 0
+        self.fast_path_hits = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.generate_time_total = 0.0
+
+    def start(self):
+        """배치 루프 시작 (실행 중인 이벤트 루프에서 호출)"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sql-generate')
+            self._db_executor = ThreadPoolExecutor(max_workers=self.db_workers, thread_name_prefix='sql-execute')
+            self._worker = asyncio.create_task(self._batch_loop())
+        return self
+
+    async def close(self):
+        """배치 루프 종료 및 스레드 풀 정리"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        # 큐에 남은 요청 취소
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+        self._model_executor.shutdown(wait=True)
+        self._db_executor.shutdown(wait=True)
+        self._worker = None
+
+    async def generate(self, text):
+        """
+        자연어 쿼리 하나를 큐에 넣고 배치 처리된 SQL을 기다림
+
+        Args:
+            text: 자연어 쿼리
+
+        Returns:
+            str: 생성된 SQL 쿼리
+        """
+        if self.fast_path is not None:
+            sql = self.fast_path(text)
+            if sql is not None:
+                self.fast_path_hits += 1
+                return sql
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def execute(self, sql):
+        """SQL을 DB 스레드 풀에서 실행"""
+        self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, self.execute_fn, sql)
+
+    def stats(self):
+        """배치 처리 통계"""
+        return {
+            "requests": self.requests,
+            "fast_path_hits": self.fast_path_hits,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "avg_generate_ms": round(self.generate_time_total / self.batches * 1000, 2) if self.batches else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    async def _collect(self):
+        """첫 요청을 기다린 뒤 max_wait 동안 또는 max_batch개까지 모음"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            # 이미 대기 중인 요청은 바로 가져옴
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # 응답을 기다리지 않는(취소된) 요청 제외
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._model_executor, self.generate_batch, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.generate_time_total += time.perf_counter() - started
+            self.requests += len(batch)
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            for (_, future), sql in zip(batch, results):
+                if not future.done():
+                    future.set_result(sql)
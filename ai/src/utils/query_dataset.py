@@ -235,38 +235,45 @@ class IoTQueryGenerator:
         
         if pattern.get('has_superlative'):
             components['superlative'] = random.choice(list(self.superlatives.keys()))
-            order = self.superlatives[components['superlative']]
-        else:
-            order = pattern.get('order', 'DESC')
         
         input_query = random.choice(pattern['templates']).format(**components)
-        
-        if pattern.get('sql_type') == 'time_stats':
-            sql_query = self.generate_time_stats_query(pattern, components)
-        elif pattern.get('sql_type') == 'stats':
-            sql_query = self.generate_stats_query(pattern, components)
-        else:
-            # function -> func in conditions
-            conditions = [f"{cond} = '{components[cond]}'" for cond in pattern['sql_conditions']]
-            
-            sql_query = "SELECT * FROM transactions"
-            if conditions:
-                sql_query += " WHERE " + " AND ".join(conditions)
-            
-            sql_query += f" ORDER BY timestamp {order}"
-            
-            if pattern.get('has_superlative'):
-                sql_query += " LIMIT 1"
-            
-            # 패턴에 limit이 존재하면 추가
-            if 'limit' in pattern:
-                sql_query += f" LIMIT {pattern['limit']}"
+        sql_query = self.build_sql(pattern, components)
         
         return {
             "input": input_query,
             "output": sql_query
         }
 
+    def build_sql(self, pattern: Dict, components: Dict) -> str:
+        """Build the SQL query for a pattern from already chosen components"""
+        if pattern.get('sql_type') == 'time_stats':
+            return self.generate_time_stats_query(pattern, components)
+        if pattern.get('sql_type') == 'stats':
+            return self.generate_stats_query(pattern, components)
+
+        if pattern.get('has_superlative'):
+            order = self.superlatives[components['superlative']]
+        else:
+            order = pattern.get('order', 'DESC')
+
+        # function -> func in conditions
+        conditions = [f"{cond} = '{components[cond]}'" for cond in pattern['sql_conditions']]
+        
+        sql_query = "SELECT * FROM transactions"
+        if conditions:
+            sql_query += " WHERE " + " AND ".join(conditions)
+        
+        sql_query += f" ORDER BY timestamp {order}"
+        
+        if pattern.get('has_superlative'):
+            sql_query += " LIMIT 1"
+        
+        # 패턴에 limit이 존재하면 추가
+        if 'limit' in pattern:
+            sql_query += f" LIMIT {pattern['limit']}"
+
+        return sql_query
+
     
     def random_hex_id(self) -> str:
         return ''.join(random.choices('abcdef0123456789', k=128))
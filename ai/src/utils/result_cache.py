@@ -0,0 +1,103 @@
+# ai/src/utils/result_cache.py
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    SQL 실행 결과(DataFrame) 캐시 (LRU, 메모리 크기 제한, thread-safe)
+
+    항목은 저장 당시의 ingest watermark와 함께 보관되며, watermark가 바뀌면(새 데이터 ingest
+    또는 retention) 해당 항목은 무효입니다. 호출한 쪽이 결과를 수정해도 캐시가 바뀌지 않도록
+    저장과 조회 모두 복사본을 사용합니다.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: 캐시된 DataFrame 전체의 최대 메모리 (df.memory_usage(deep=True) 기준)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # SQL -> (watermark, DataFrame, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.oversized = 0
+
+    def get(self, sql, watermark):
+        """
+        캐시된 결과 조회
+
+        Args:
+            sql: 실행할 SQL
+            watermark: 현재 ingest watermark
+
+        Returns:
+            DataFrame: 결과 복사본 (없거나 watermark가 다르면 None)
+        """
+        with self._lock:
+            entry = self._entries.get(sql)
+            if entry is not None and entry[0] != watermark:
+                self._remove(sql)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sql)
+            self.hits += 1
+            df = entry[1]
+        return df.copy()
+
+    def put(self, sql, watermark, df):
+        """
+        실행 결과 저장 (max_bytes보다 큰 결과는 저장하지 않음)
+
+        Returns:
+            bool: 저장 여부
+        """
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            with self._lock:
+                self.oversized += 1
+            return False
+
+        df = df.copy()
+        with self._lock:
+            if sql in self._entries:
+                self._remove(sql)
+            self._entries[sql] = (watermark, df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _remove(self, sql):
+        _, _, size = self._entries.pop(sql)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """캐시 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "oversized": self.oversized
+            }
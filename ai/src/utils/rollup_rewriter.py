@@ -0,0 +1,68 @@
+import re
+
+# IoTQueryGenerator의 time_stats / stats 패턴을 usage_rollups 테이블 쿼리로 변환
+# (backend/rollups.py가 ingest 시점에 hour/day/month 단위로 집계)
+
+_FILTER = r"(?: WHERE (?P<column>device_type|func) = '(?P<filter>[^']*)')?"
+
+TIME_STATS_PATTERN = re.compile(
+    r"SELECT (?P<extract>HOUR\(timestamp\)|DATE\(timestamp\)|DATE_FORMAT\(timestamp, '%Y-%m'\)|YEAR\(timestamp\)) as (?P<alias>hour|date|month|year),"
+    r" COUNT\(\*\) as count, COUNT\(\*\) \* 100\.0 / SUM\(COUNT\(\*\)\) OVER\(\) as percentage"
+    r" FROM transactions" + _FILTER +
+    r" GROUP BY (?P=extract) ORDER BY (?P=alias)$",
+    re.IGNORECASE
+)
+
+STATS_PATTERN = re.compile(
+    r"SELECT value as value, COUNT\(\*\) as count, COUNT\(\*\) \* 100\.0 / SUM\(COUNT\(\*\)\) OVER\(\) as percentage"
+    r" FROM transactions" + _FILTER +
+    r" GROUP BY value ORDER BY count DESC$",
+    re.IGNORECASE
+)
+
+# 결과 alias -> (사용할 rollup 단위, bucket에서 값을 뽑는 식)
+TIME_GROUPINGS = {
+    'hour': ('hour', "HOUR(bucket)"),
+    'date': ('day', "DATE(bucket)"),
+    'month': ('month', "DATE_FORMAT(bucket, '%Y-%m')"),
+    'year': ('month', "YEAR(bucket)")
+}
+
+
+def _rollup_query(select_expr, alias, granularity, match, order_by):
+    conditions = [f"granularity = '{granularity}'"]
+    if match.group('column'):
+        conditions.append(f"{match.group('column')} = '{match.group('filter')}'")
+    return (
+        f"SELECT {select_expr} as {alias}, "
+        f"CAST(SUM(event_count) AS SIGNED) as count, "
+        f"SUM(event_count) * 100.0 / SUM(SUM(event_count)) OVER() as percentage "
+        f"FROM usage_rollups WHERE {' AND '.join(conditions)} "
+        f"GROUP BY {select_expr} ORDER BY {order_by}"
+    )
+
+
+def rewrite_for_rollups(query):
+    """
+    집계 패턴 쿼리를 usage_rollups 기반 쿼리로 변환
+
+    Args:
+        query: 모델이 생성한 SQL
+
+    Returns:
+        str: rollup 테이블 쿼리, 변환할 수 없는 쿼리면 None
+    """
+    normalized = ' '.join(query.split()).rstrip(';')
+
+    match = TIME_STATS_PATTERN.match(normalized)
+    if match:
+        alias = match.group('alias').lower()
+        granularity, select_expr = TIME_GROUPINGS[alias]
+        return _rollup_query(select_expr, alias, granularity, match, alias)
+
+    match = STATS_PATTERN.match(normalized)
+    if match:
+        # 값 분포는 시간과 무관하므로 가장 작은 month 단위를 사용
+        return _rollup_query("value", "value", 'month', match, "count DESC")
+
+    return None
@@ -1,27 +1,83 @@
 from config.model_config import ModelConfig
 from trainer.sql_trainer import SQLTrainer
 from utils.sql_executor import SQLExecutor
+from utils.translation_cache import TranslationCache
+from utils.template_router import TemplateRouter
 
 class SQLAssistant:
     """자연어를 SQL로 변환하고 실행을 관리하는 클래스"""
     
-    def __init__(self, host, user, password, database, port=3306):
+    def __init__(self, host, user, password, database, port=3306, id_storage='hex', use_rollups=True,
+                 database_url=None):
         """SQL 어시스턴트 초기화"""
         # AI 모델 초기화
         print("Loading model...")
         self.config = ModelConfig()
         self.trainer = SQLTrainer(self.config)
         self.trainer.load_model(self.config.output_dir)
+        # 자연어 → SQL 변환 캐시 (ID만 다른 쿼리도 재사용)
+        self.translation_cache = TranslationCache(self.config.translation_cache_size,
+                                                  self.config.translation_cache_ttl)
+        # 학습 템플릿과 일치하는 쿼리는 모델 없이 변환
+        self.template_router = TemplateRouter() if self.config.use_template_router else None
         
         # SQL 실행기 초기화
         print("Connecting to database...")
-        self.executor = SQLExecutor(host, user, password, database, port)
+        self.executor = SQLExecutor(host, user, password, database, port, id_storage, use_rollups, database_url,
+                                    result_cache_bytes=self.config.result_cache_mb * 1024 * 1024,
+                                    watermark_ttl=self.config.watermark_ttl)
     
+    def route_template(self, text_input):
+        """템플릿 fast path (일치하지 않거나 비활성화되어 있으면 None)"""
+        if self.template_router is None:
+            return None
+        return self.template_router.route(text_input)
+
+    def lookup_sql(self, text_input):
+        """
+        모델 없이 바로 답할 수 있는 SQL (템플릿 fast path → 변환 캐시 순, 없으면 None)
+        BatchScheduler의 fast_path로 쓰여 큐에 넣기 전에 확인됨
+        """
+        sql_query = self.route_template(text_input)
+        if sql_query is not None:
+            return sql_query
+        return self.translation_cache.get(text_input)
+
+    def generate_sql(self, text_input):
+        """자연어 쿼리를 SQL로 변환 (템플릿 fast path → 캐시 → 모델 순)"""
+        sql_query = self.lookup_sql(text_input)
+        if sql_query is not None:
+            return sql_query
+        return self.generate_sql_batch([text_input], use_cache=False)[0]
+
+    def generate_sql_batch(self, text_inputs, use_cache=True):
+        """
+        자연어 쿼리 여러 개를 한 번에 SQL로 변환 (입력 순서 유지, 캐시에 없는 쿼리만 모델 실행)
+        템플릿 fast path는 호출하는 쪽에서 먼저 확인합니다. 이미 lookup_sql로 캐시를 확인한
+        쿼리는 use_cache=False로 넘겨 조회를 건너뜀 (생성 결과는 항상 캐시에 저장)
+        """
+        if use_cache:
+            results = [self.translation_cache.get(text) for text in text_inputs]
+        else:
+            results = [None] * len(text_inputs)
+        # 같은 쿼리가 여러 번 있으면 한 번만 생성
+        misses = list(dict.fromkeys(text for text, sql in zip(text_inputs, results) if sql is None))
+        if misses:
+            generated = dict(zip(misses, self.trainer.generate_sql_batch(misses)))
+            for text, sql in generated.items():
+                self.translation_cache.put(text, sql)
+            results = [sql if sql is not None else generated[text] for text, sql in zip(text_inputs, results)]
+        return results
+
+    def execute_sql(self, sql_query):
+        """생성된 SQL 실행 (실패 시 None)"""
+        return self.executor.execute_query(sql_query)
+
     def process_query(self, text_input, execute=True):
         """자연어 쿼리 처리 및 실행"""
         try:
             # SQL 쿼리 생성
-            sql_query = self.trainer.generate_sql(text_input)
+            sql_query = self.generate_sql(text_input)
             print("\nGenerated SQL Query:")
             print("-" * 50)
             print(sql_query)
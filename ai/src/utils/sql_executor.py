@@ -1,28 +1,108 @@
+import re
+import time
+import threading
 import pandas as pd
-from sqlalchemy import create_engine
+
+from backend.storage import create_storage_engine, translate_sql, read_ingest_watermark
+from utils.rollup_rewriter import rewrite_for_rollups
+from utils.result_cache import ResultCache
+
+# device_id/user_id 비교 리터럴 (예: device_id = 'ab12...')
+ID_LITERAL_PATTERN = re.compile(r"\b(device_id|user_id)\s*=\s*'([0-9a-fA-F]+)'")
+ID_COLUMNS = ('device_id', 'user_id')
 
 class SQLExecutor:
-    """SQL 쿼리를 직접 실행하는 클래스 (MySQL 전용)"""
+    """SQL 쿼리를 직접 실행하는 클래스 (MySQL 또는 database_url로 지정한 backend)"""
     
-    def __init__(self, host, user, password, database, port=3306):
-        """MySQL 데이터베이스 연결 초기화"""
+    def __init__(self, host, user, password, database, port=3306, id_storage='hex', use_rollups=True,
+                 database_url=None, result_cache_bytes=64 * 1024 * 1024, watermark_ttl=1.0):
+        """데이터베이스 연결 초기화 (database_url이 없으면 MySQL 접속 정보 사용)"""
+        # 실행 결과 캐시 (0이면 사용 안 함). ingest watermark가 바뀌면 무효화
+        self.result_cache = ResultCache(result_cache_bytes) if result_cache_bytes else None
+        # watermark 조회 간격 (초): 이 시간 동안은 DB를 조회하지 않고 마지막 값을 사용
+        self.watermark_ttl = watermark_ttl
+        self._watermark = None
+        self._watermark_checked = None
+        self._watermark_lock = threading.Lock()
         try:
-            # SQLAlchemy engine 생성
-            self.engine = create_engine(
-                f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}'
+            # True이면 시간/값 분포 집계 쿼리를 usage_rollups 테이블에서 처리
+            self.use_rollups = use_rollups
+            # 'binary'이면 device_id/user_id가 VARBINARY로 저장되어 있음 (backend IOT_ID_STORAGE와 동일하게 설정)
+            self.id_storage = id_storage
+            # SQLAlchemy engine 생성 (backend와 같은 storage 설정 공유)
+            self.engine = create_storage_engine(
+                database_url or f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}'
             )
             # 연결 테스트
             with self.engine.connect() as conn:
-                print(f"Connected to MySQL database '{database}' at {host}:{port}")
+                print(f"Connected to {self.engine.dialect.name} database at {self.engine.url.render_as_string(hide_password=True)}")
         except Exception as e:
-            print(f"Error initializing MySQL database: {str(e)}")
+            print(f"Error initializing database: {str(e)}")
             raise
     
+    def prepare_query(self, query):
+        """ID 저장 방식에 맞게 hex ID 리터럴을 변환"""
+        if self.id_storage != 'binary':
+            return query
+        return ID_LITERAL_PATTERN.sub(lambda m: f"{m.group(1)} = UNHEX('{m.group(2)}')", query)
+
+    def format_result(self, df):
+        """binary ID 컬럼을 hex 문자열로 변환"""
+        if self.id_storage != 'binary':
+            return df
+        for column in ID_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].map(lambda v: bytes(v).hex() if isinstance(v, (bytes, bytearray, memoryview)) else v)
+        return df
+
+    def read_sql(self, query):
+        """backend dialect에 맞게 변환한 뒤 실행"""
+        return pd.read_sql_query(translate_sql(query, self.engine.dialect.name), self.engine)
+
+    def current_watermark(self):
+        """ingest watermark (watermark_ttl 동안 캐시, 테이블이 없으면 None)"""
+        with self._watermark_lock:
+            now = time.monotonic()
+            if self._watermark_checked is None or now - self._watermark_checked >= self.watermark_ttl:
+                try:
+                    with self.engine.connect() as conn:
+                        self._watermark = read_ingest_watermark(conn)
+                except Exception as e:
+                    # 이전 버전 backend 등: watermark 없이 캐시 사용 안 함
+                    if self._watermark_checked is None:
+                        print(f"Ingest watermark unavailable, result cache disabled: {str(e)}")
+                    self._watermark = None
+                self._watermark_checked = now
+            return self._watermark
+
     def execute_query(self, query):
-        """SQL 쿼리 실행"""
+        """SQL 쿼리 실행 (같은 SQL이 최근 ingest 이후 실행된 적 있으면 캐시된 결과 반환)"""
+        # 실행 전에 watermark를 읽어야 실행 중 ingest된 결과가 이전 watermark로 남지 않음
+        watermark = self.current_watermark() if self.result_cache is not None else None
+        if watermark is not None:
+            cached = self.result_cache.get(query, watermark)
+            if cached is not None:
+                return cached
+
+        result = self.run_query(query)
+        if watermark is not None and result is not None:
+            self.result_cache.put(query, watermark, result)
+        return result
+
+    def run_query(self, query):
+        """SQL 쿼리를 DB에서 실행"""
         try:
-            df = pd.read_sql_query(query, self.engine)
-            return df
+            if self.use_rollups:
+                rollup_query = rewrite_for_rollups(query)
+                if rollup_query is not None:
+                    try:
+                        return self.read_sql(rollup_query)
+                    except Exception as e:
+                        # rollup 테이블이 없는 DB 등: 원본 쿼리로 실행
+                        print(f"Rollup query failed, falling back to raw table: {str(e)}")
+
+            df = self.read_sql(self.prepare_query(query))
+            return self.format_result(df)
         except Exception as e:
             print(f"Error executing query: {str(e)}")
             return None
@@ -31,4 +111,4 @@ class SQLExecutor:
         """데이터베이스 연결 종료"""
         if hasattr(self, 'engine'):
             self.engine.dispose()
-            print("MySQL database connection closed.")
\ No newline at end of file
+            print("Database connection closed.")
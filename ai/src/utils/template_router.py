@@ -0,0 +1,160 @@
+# ai/src/utils/template_router.py
+import re
+import os
+import sys
+import json
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.query_dataset import IoTQueryGenerator
+
+HEX_ID = r"[0-9a-fA-F]{64,}"
+SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class TemplateRouter:
+    """
+    학습 템플릿(IoTQueryGenerator.query_patterns)과 정확히 일치하는 쿼리를 모델 없이 SQL로 변환
+
+    템플릿마다 slot(device_type/func/superlative/ID)을 캡처하는 정규식을 만들고 첫 단어로 후보를
+    나눠 둡니다. 템플릿과 완전히 일치하고 slot 값이 알려진 값일 때만 build_sql로 SQL을 만들고,
+    그 외에는 None을 반환해 모델로 넘깁니다.
+    """
+
+    def __init__(self, generator=None, default_superlative='last'):
+        """
+        Args:
+            generator: 템플릿과 SQL 규칙을 가진 IoTQueryGenerator (기본값: 새로 생성)
+            default_superlative: 템플릿에 superlative slot이 없는 superlative 패턴에 쓸 값
+                                 (예: "When did user ... last use ..." → 'last' → DESC)
+        """
+        self.generator = generator or IoTQueryGenerator()
+        self.default_superlative = default_superlative
+
+        functions = sorted({func for funcs in self.generator.functions.values() for func in funcs})
+        # slot 이름 -> (정규식, 소문자 값 -> 원래 값)
+        self.slots = {
+            'device_type': self._vocabulary(self.generator.device_types),
+            'func': self._vocabulary(functions),
+            'superlative': self._vocabulary(self.generator.superlatives),
+            'device_id': (HEX_ID, None),
+            'user_id': (HEX_ID, None)
+        }
+
+        # 첫 단어(소문자) -> [(정규식, 패턴)]
+        self._routes = {}
+        for pattern in self.generator.query_patterns:
+            for template in pattern['templates']:
+                first_word = template.split(' ', 1)[0].lower()
+                self._routes.setdefault(first_word, []).append((self._compile(template), pattern))
+
+        # 통계
+        self.lookups = 0
+        self.hits = 0
+        self.lookup_time_total = 0.0
+
+    @staticmethod
+    def _vocabulary(values):
+        # 긴 값부터 시도 ('most recent'가 'most'보다 먼저)
+        ordered = sorted(values, key=len, reverse=True)
+        return "|".join(re.escape(value) for value in ordered), {value.lower(): value for value in values}
+
+    def _compile(self, template):
+        parts = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(template):
+            parts.append(re.escape(template[position:match.start()]))
+            name = match.group(1)
+            # 같은 slot이 두 번 나오면 같은 값이어야 함
+            if f"(?P<{name}>" in "".join(parts):
+                parts.append(f"(?P={name})")
+            else:
+                parts.append(f"(?P<{name}>{self.slots[name][0]})")
+            position = match.end()
+        parts.append(re.escape(template[position:]))
+        return re.compile("".join(parts), re.IGNORECASE)
+
+    def match(self, text):
+        """
+        쿼리와 일치하는 템플릿 찾기
+
+        Args:
+            text: 자연어 쿼리
+
+        Returns:
+            tuple: (패턴, slot 값) 또는 일치하는 템플릿이 없으면 None
+        """
+        text = TRAILING_PUNCTUATION.sub("", WHITESPACE_PATTERN.sub(" ", text).strip())
+        first_word = text.split(' ', 1)[0].lower()
+        for regex, pattern in self._routes.get(first_word, ()):
+            found = regex.fullmatch(text)
+            if found is None:
+                continue
+            components = {}
+            for name, value in found.groupdict().items():
+                vocabulary = self.slots[name][1]
+                components[name] = vocabulary[value.lower()] if vocabulary else value
+            if pattern.get('has_superlative'):
+                components.setdefault('superlative', self.default_superlative)
+            return pattern, components
+        return None
+
+    def route(self, text):
+        """
+        템플릿과 일치하면 SQL 생성
+
+        Args:
+            text: 자연어 쿼리
+
+        Returns:
+            str: 생성된 SQL (일치하는 템플릿이 없으면 None → 모델 사용)
+        """
+        started = time.perf_counter()
+        matched = self.match(text)
+        sql = self.generator.build_sql(*matched) if matched else None
+        self.lookup_time_total += time.perf_counter() - started
+        self.lookups += 1
+        if sql is not None:
+            self.hits += 1
+        return sql
+
+    def stats(self):
+        """fast path 통계"""
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "avg_lookup_us": round(self.lookup_time_total / self.lookups * 1e6, 2) if self.lookups else 0.0
+        }
+
+
+if __name__ == "__main__":
+    # query_dataset.json으로 fast path 적중률과 정확도 확인
+    dataset_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'query_dataset.json')
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)["dataset"]
+
+    router = TemplateRouter()
+    correct = 0
+    mismatches = {}
+    for item in dataset:
+        sql = router.route(item["input"])
+        if sql is None:
+            continue
+        if sql == item["output"]:
+            correct += 1
+        else:
+            matched_template = router.match(item["input"])[0]['templates'][0]
+            mismatches[matched_template] = mismatches.get(matched_template, 0) + 1
+
+    stats = router.stats()
+    print(f"Queries: {len(dataset)}")
+    print(f"Fast path hits: {stats['hits']} ({stats['hit_rate']:.2%})")
+    print(f"Exact SQL match: {correct} ({correct / max(stats['hits'], 1):.2%} of hits)")
+    print(f"Average lookup: {stats['avg_lookup_us']} us")
+    if mismatches:
+        print("\nMismatches by pattern (first template):")
+        for template, count in sorted(mismatches.items(), key=lambda item: -item[1]):
+            print(f"  {count:>5}  {template}")
@@ -0,0 +1,144 @@
+# ai/src/utils/translation_cache.py
+import re
+import time
+import threading
+from collections import OrderedDict
+
+# device_id/user_id로 쓰이는 긴 hex 토큰 (128/130자)
+HEX_ID_PATTERN = re.compile(r"\b[0-9a-fA-F]{64,}\b")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+PLACEHOLDER = "__ID{}__"
+
+
+def normalize_query(text):
+    """
+    자연어 쿼리를 캐시 키로 정규화
+
+    공백을 하나로 합치고 hex ID를 등장 순서대로 placeholder로 바꿉니다.
+    (대소문자는 모델 출력에 영향을 주므로 유지)
+
+    Args:
+        text: 자연어 쿼리
+
+    Returns:
+        tuple: (정규화된 키, placeholder 순서대로의 ID 리스트)
+    """
+    ids = []
+
+    def replace(match):
+        value = match.group(0)
+        if value not in ids:
+            ids.append(value)
+        return PLACEHOLDER.format(ids.index(value))
+
+    key = HEX_ID_PATTERN.sub(replace, WHITESPACE_PATTERN.sub(" ", text).strip())
+    return key, ids
+
+
+class TranslationCache:
+    """
+    자연어 → SQL 변환 결과 캐시 (LRU + TTL, thread-safe)
+
+    ID만 다른 쿼리가 같은 항목을 쓰도록 SQL도 ID를 placeholder로 바꾼 템플릿으로 저장하고,
+    조회 시 요청의 ID를 다시 채워 넣습니다.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600.0, clock=time.monotonic):
+        """
+        Args:
+            max_size: 최대 항목 수 (넘으면 가장 오래 안 쓴 항목부터 제거)
+            ttl: 항목 유효 시간 (초, None 또는 0이면 만료 없음)
+            clock: 시간 함수
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (SQL 템플릿, 저장 시각)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.uncacheable = 0
+
+    def get(self, text):
+        """
+        캐시된 SQL 조회
+
+        Args:
+            text: 자연어 쿼리
+
+        Returns:
+            str: 요청의 ID가 채워진 SQL (없으면 None)
+        """
+        key, ids = normalize_query(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and self.clock() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        sql = entry[0]
+        for index, value in enumerate(ids):
+            sql = sql.replace(PLACEHOLDER.format(index), value)
+        return sql
+
+    def put(self, text, sql):
+        """
+        변환 결과 저장
+
+        쿼리의 ID가 모두 SQL에 그대로 들어 있고 SQL에 다른 hex ID가 없을 때만 저장합니다.
+        (모델이 ID를 잘못 옮긴 결과가 다른 ID의 요청에 재사용되지 않도록)
+
+        Args:
+            text: 자연어 쿼리
+            sql: 생성된 SQL
+
+        Returns:
+            bool: 저장 여부
+        """
+        key, ids = normalize_query(text)
+        template = sql
+        for index, value in enumerate(ids):
+            if value not in template:
+                template = None
+                break
+            template = template.replace(value, PLACEHOLDER.format(index))
+        if template is None or HEX_ID_PATTERN.search(template):
+            with self._lock:
+                self.uncacheable += 1
+            return False
+
+        with self._lock:
+            self._entries[key] = (template, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """캐시 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "uncacheable": self.uncacheable
+            }
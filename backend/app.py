@@ -1,4 +1,5 @@
 from flask import Flask, jsonify, request
+import click
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 import sys
@@ -9,7 +10,12 @@ from datetime import datetime
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.database import db, SimulationLog 
+from backend.database import db, validate_id
+from backend.log_query import fetch_logs_page, state_distribution, parse_fields, decode_cursor, FILTER_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.storage import configure_engine
+from backend.migrations import run_migrations
+from backend.partitions import ensure_partitions, apply_retention, DEFAULT_MONTHS_AHEAD
+from backend.ingest import save_logs, ingest_stream, IngestError, DEFAULT_CHUNK_SIZE, DEFAULT_BATCH_SIZE
 
 HTTP_200_OK = 200
 HTTP_400_BAD_REQUEST = 400
@@ -37,17 +43,56 @@ PASSWORD = ""
 HOST = "localhost"  # MySQL 서버가 로컬에 있을 경우
 DATABASE = "iotlogs"
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOST}/{DATABASE}"
+# IOT_DATABASE_URL selects another storage backend (MySQL or SQLite), e.g. sqlite:///iotlogs.db for local runs
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'IOT_DATABASE_URL', f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOST}/{DATABASE}"
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Number of rows written per multi-row INSERT during ingest
+app.config['INGEST_CHUNK_SIZE'] = int(os.environ.get('INGEST_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+# Number of NDJSON lines committed per transaction by /simulate/stream
+app.config['INGEST_BATCH_SIZE'] = int(os.environ.get('INGEST_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+# Page size limits for /get_logs
+app.config['LOGS_PAGE_SIZE'] = int(os.environ.get('LOGS_PAGE_SIZE', DEFAULT_PAGE_SIZE))
+app.config['LOGS_MAX_PAGE_SIZE'] = int(os.environ.get('LOGS_MAX_PAGE_SIZE', MAX_PAGE_SIZE))
+# Monthly partitions kept ahead of the current month, and months of data kept by apply-retention
+app.config['PARTITION_MONTHS_AHEAD'] = int(os.environ.get('PARTITION_MONTHS_AHEAD', DEFAULT_MONTHS_AHEAD))
+app.config['RETENTION_MONTHS'] = int(os.environ.get('RETENTION_MONTHS', 12))
+
 # Initialize SQLAlchemy with Flask app
 db.init_app(app)
 
-# Drop existing tables and create new ones
+# Create missing tables and apply pending schema migrations (existing data is kept)
 with app.app_context():
-   db.drop_all()
-   db.create_all()
-   logging.info("Database tables created successfully")
+   configure_engine(db.engine)
+   run_migrations()
+   with db.engine.begin() as conn:
+       ensure_partitions(conn, app.config['PARTITION_MONTHS_AHEAD'])
+
+
+@app.cli.command('ensure-partitions')
+def ensure_partitions_command():
+    """Create the upcoming monthly partitions of the transactions table"""
+    with db.engine.begin() as conn:
+        created = ensure_partitions(conn, app.config['PARTITION_MONTHS_AHEAD'])
+    click.echo(f"Created partitions: {', '.join(created) or 'none'}")
+
+
+@app.cli.command('apply-retention')
+@click.option('--keep-months', type=click.IntRange(min=1), default=None, help='Months of data to keep (default: RETENTION_MONTHS)')
+@click.option('--archive', is_flag=True, help='Move expired partitions into archive tables instead of dropping them')
+def apply_retention_command(keep_months, archive):
+    """Drop (or archive) whole months of transactions older than the retention window"""
+    if keep_months is None:
+        keep_months = app.config['RETENTION_MONTHS']
+    try:
+        # apply_retention commits itself (batch by batch on non-partitioned tables)
+        with db.engine.connect() as conn:
+            result = apply_retention(conn, keep_months, archive=archive)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    click.echo(json.dumps(result, indent=2))
 
 
 @app.route('/simulate', methods=['POST'])
@@ -71,18 +116,35 @@ def simulate():
             }), HTTP_422_UNPROCESSABLE_ENTITY
         
         logs = data["logs"]
+        if not isinstance(logs, list):
+            logging.error("logs field is not a list")
+            return jsonify({
+                "status": "error",
+                "code": HTTP_422_UNPROCESSABLE_ENTITY,
+                "message": "logs field must be a list"
+            }), HTTP_422_UNPROCESSABLE_ENTITY
+
+        chunk_size = request.args.get('chunk_size', app.config['INGEST_CHUNK_SIZE'], type=int)
+        if not chunk_size or chunk_size < 1:
+            return jsonify({
+                "status": "error",
+                "code": HTTP_400_BAD_REQUEST,
+                "message": "chunk_size must be a positive integer"
+            }), HTTP_400_BAD_REQUEST
+
         logging.info(f"Received {len(logs)} logs for processing")
         
         try:
-            save_simulation_logs(logs)
+            stats = save_logs(logs, chunk_size)
             return jsonify({
                 "status": "success",
                 "code": HTTP_200_OK,
-                "message": f"Successfully processed {len(logs)} logs"
+                "message": f"Successfully processed {stats['accepted']} of {len(logs)} logs",
+                "ingest": stats
             }), HTTP_200_OK
             
         except Exception as e:
-            logging.error(f"Error in save_simulation_logs: {str(e)}")
+            logging.error(f"Error in save_logs: {str(e)}")
             return jsonify({
                 "status": "error",
                 "code": HTTP_500_INTERNAL_SERVER_ERROR,
@@ -97,42 +159,111 @@ def simulate():
             "message": str(e)
         }), HTTP_500_INTERNAL_SERVER_ERROR
 
+@app.route('/simulate/stream', methods=['POST'])
+def simulate_stream():
+    """Ingest newline-delimited JSON logs (optionally gzip-compressed) straight from the request stream"""
+    batch_size = request.args.get('batch_size', app.config['INGEST_BATCH_SIZE'], type=int)
+    chunk_size = request.args.get('chunk_size', app.config['INGEST_CHUNK_SIZE'], type=int)
+    if not batch_size or batch_size < 1 or not chunk_size or chunk_size < 1:
+        return jsonify({
+            "status": "error",
+            "code": HTTP_400_BAD_REQUEST,
+            "message": "batch_size and chunk_size must be positive integers"
+        }), HTTP_400_BAD_REQUEST
+
+    content_encoding = request.headers.get('Content-Encoding', '').lower()
+    if content_encoding not in ('', 'identity', 'gzip'):
+        return jsonify({
+            "status": "error",
+            "code": HTTP_422_UNPROCESSABLE_ENTITY,
+            "message": f"Unsupported Content-Encoding: {content_encoding}"
+        }), HTTP_422_UNPROCESSABLE_ENTITY
+
+    try:
+        stats = ingest_stream(
+            request.stream,
+            batch_size=batch_size,
+            chunk_size=chunk_size,
+            gzipped=content_encoding == 'gzip'
+        )
+        return jsonify({
+            "status": "success",
+            "code": HTTP_200_OK,
+            "message": f"Successfully processed {stats['accepted']} logs",
+            "ingest": stats
+        }), HTTP_200_OK
+
+    except IngestError as e:
+        logging.error(f"Error in ingest_stream: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "code": HTTP_500_INTERNAL_SERVER_ERROR,
+            "message": str(e),
+            "ingest": e.stats
+        }), HTTP_500_INTERNAL_SERVER_ERROR
+
+    except Exception as e:
+        logging.error(f"Error processing the log stream: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "code": HTTP_500_INTERNAL_SERVER_ERROR,
+            "message": str(e)
+        }), HTTP_500_INTERNAL_SERVER_ERROR
+
 @app.route('/get_logs', methods=['GET'])
 def get_logs():
     try:
-        logs = SimulationLog.query.order_by(SimulationLog.timestamp.desc()).all()
+        limit = request.args.get('limit', app.config['LOGS_PAGE_SIZE'], type=int)
+        if not limit or limit < 1 or limit > app.config['LOGS_MAX_PAGE_SIZE']:
+            return jsonify({
+                "status": "error",
+                "code": HTTP_400_BAD_REQUEST,
+                "message": f"limit must be between 1 and {app.config['LOGS_MAX_PAGE_SIZE']}"
+            }), HTTP_400_BAD_REQUEST
+
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            cursor = request.args.get('cursor')
+            cursor = decode_cursor(cursor) if cursor else None
+            start = request.args.get('start')
+            start = datetime.fromisoformat(start) if start else None
+            end = request.args.get('end')
+            end = datetime.fromisoformat(end) if end else None
+            filters = {field: request.args[field] for field in FILTER_FIELDS if request.args.get(field)}
+            for field in ('device_id', 'user_id'):
+                if field in filters:
+                    filters[field] = validate_id(filters[field])
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "code": HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }), HTTP_400_BAD_REQUEST
+
+
+        logs_data, next_cursor = fetch_logs_page(
+            fields=fields,
+            filters=filters,
+            start=start,
+            end=end,
+            cursor=cursor,
+            limit=limit
+        )
         
-        if not logs:
+        if not logs_data:
             return jsonify({
                 "status": "success",
                 "code": HTTP_200_OK,
                 "data": [],
+                "next_cursor": None,
                 "message": "No logs found"
             }), HTTP_200_OK
-            
-        logs_data = []
-        for log in logs:
-            try:
-                state = json.loads(log.state)
-            except:
-                state = log.state
-
-            logs_data.append({
-                'id': log.id,
-                'device_type': log.device_type,
-                'device_id': log.device_id,
-                'user_id': log.user_id,
-                'action': log.action,
-                'value': log.value,
-                'func': log.func,
-                'timestamp': log.timestamp.isoformat(),
-                'state': state
-            })
 
         return jsonify({
             "status": "success",
             "code": HTTP_200_OK,
-            "data": logs_data
+            "data": logs_data,
+            "next_cursor": next_cursor
         }), HTTP_200_OK
         
     except Exception as e:
@@ -143,6 +274,42 @@ def get_logs():
             "message": str(e)
         }), HTTP_500_INTERNAL_SERVER_ERROR
 
+@app.route('/stats/state', methods=['GET'])
+def get_state_stats():
+    """Distribution of a device state field (power, brightness, color, mode, volume) aggregated in the database"""
+    try:
+        try:
+            start = request.args.get('start')
+            start = datetime.fromisoformat(start) if start else None
+            end = request.args.get('end')
+            end = datetime.fromisoformat(end) if end else None
+            data = state_distribution(
+                request.args.get('field', ''),
+                device_type=request.args.get('device_type'),
+                start=start,
+                end=end
+            )
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "code": HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }), HTTP_400_BAD_REQUEST
+
+        return jsonify({
+            "status": "success",
+            "code": HTTP_200_OK,
+            "data": data
+        }), HTTP_200_OK
+
+    except Exception as e:
+        logging.error(f"Error fetching state stats: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "code": HTTP_500_INTERNAL_SERVER_ERROR,
+            "message": str(e)
+        }), HTTP_500_INTERNAL_SERVER_ERROR
+
 @app.route('/get_logs', methods=['OPTIONS'])
 def handle_options():
     response = jsonify({})
@@ -152,40 +319,5 @@ def handle_options():
     return response
 
 
-def save_simulation_logs(logs):
-   try:
-       for log in logs:
-           # Convert state to string if it's a dictionary
-           state = json.dumps(log['state']) if isinstance(log['state'], dict) else str(log['state'])
-           
-           # Handle ISO format timestamp 
-           if isinstance(log['timestamp'], str):
-               try:
-                   timestamp = datetime.fromisoformat(log['timestamp'].replace('T', ' '))
-               except Exception as e:
-                   logging.error(f"Error parsing timestamp: {log['timestamp']}")
-                   timestamp = datetime.now()  # Use current time if parsing fails
-           else:
-               timestamp = log['timestamp']
-
-           simulation_log = SimulationLog(
-               device_type=log['device_type'],
-               device_id=log['device_id'],
-               user_id=log['user_id'],
-               action=log['action'],
-               value=str(log['value']),
-               func=log['func'],
-               timestamp=timestamp,
-               state=state
-           )
-           db.session.add(simulation_log)
-           
-       db.session.commit()
-       logging.info(f"Successfully saved {len(logs)} logs to database")
-   except Exception as e:
-       logging.error(f"Error saving logs to database: {e}")
-       db.session.rollback()
-       raise
-
 if __name__ == '__main__':
    app.run(debug=True)
@@ -0,0 +1,199 @@
+# backend/bench_indexes.py
+"""
+Benchmark the IoTQueryGenerator query patterns against the transactions table
+with and without the secondary indexes defined on SimulationLog.
+
+Run against a scratch database, the table is dropped and re-seeded:
+    python backend/bench_indexes.py --rows 200000 --db-url mysql+pymysql://root:@localhost/iotlogs_bench
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'src')))
+
+from backend.database import SimulationLog
+from backend.storage import create_storage_engine, translate_sql
+from utils.query_dataset import IoTQueryGenerator
+
+DEFAULT_DB_URL = "mysql+pymysql://root:@localhost/iotlogs_bench"
+
+LIGHT_VALUES = {
+    'turnOn': ['on'],
+    'turnOff': ['off'],
+    'setBrightness': [str(v) for v in range(0, 101)],
+    'setMode': ['normal', 'night', 'reading', 'party'],
+    'setColor': ['red', 'green', 'blue', 'yellow', 'white']
+}
+SPEAKER_VALUES = {
+    'turnOn': ['on'],
+    'turnOff': ['off'],
+    'getWeather': ['weather'],
+    'getNews': ['news'],
+    'getTime': ['time'],
+    'getJoke': ['joke'],
+    'getReminder': ['reminder'],
+    'getMusic': ['music']
+}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark transactions indexes against generated query patterns')
+    parser.add_argument('--db-url', type=str, default=DEFAULT_DB_URL,
+                        help='SQLAlchemy URL of a scratch database (the transactions table is recreated)')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of rows to seed')
+    parser.add_argument('--users', type=int, default=200, help='Number of distinct users')
+    parser.add_argument('--devices-per-user', type=int, default=3, help='Devices per user')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    return parser.parse_args()
+
+
+def random_hex_id(rng, length=130):
+    return ''.join(rng.choices('0123456789abcdef', k=length))
+
+
+def seed_rows(engine, args, rng):
+    """Seed the transactions table and return the pools used for query components"""
+    table = SimulationLog.__table__
+    devices = []
+    for _ in range(args.users):
+        user_id = random_hex_id(rng)
+        for _ in range(args.devices_per_user):
+            devices.append((rng.choice(['Light', 'Speaker']), random_hex_id(rng), user_id))
+
+    start = datetime.now() - timedelta(days=90)
+    rows = []
+    with engine.begin() as conn:
+        for i in range(args.rows):
+            device_type, device_id, user_id = rng.choice(devices)
+            values = LIGHT_VALUES if device_type == 'Light' else SPEAKER_VALUES
+            func = rng.choice(list(values))
+            value = rng.choice(values[func])
+            rows.append({
+                'device_type': device_type,
+                'device_id': device_id,
+                'user_id': user_id,
+                'action': 'power' if func in ('turnOn', 'turnOff') else func,
+                'value': value,
+                'func': func,
+                'timestamp': start + timedelta(seconds=rng.randint(0, 90 * 24 * 3600)),
+                'state': json.dumps({'power': 'on'})
+            })
+            if len(rows) == 5000:
+                conn.execute(table.insert(), rows)
+                rows = []
+        if rows:
+            conn.execute(table.insert(), rows)
+    return devices
+
+
+def build_queries(generator, devices, rng):
+    """Build one concrete SQL query per IoTQueryGenerator pattern"""
+    queries = []
+    for number, pattern in enumerate(generator.query_patterns, start=1):
+        device_type, device_id, user_id = rng.choice(devices)
+        components = {
+            'device_type': device_type,
+            'device_id': device_id,
+            'user_id': user_id,
+            'func': rng.choice(generator.functions[device_type])
+        }
+        if pattern.get('has_superlative'):
+            components['superlative'] = rng.choice(list(generator.superlatives))
+        label = pattern['templates'][0][:40]
+        sql = ' '.join(generator.build_sql(pattern, components).split())
+        queries.append((f"{number:02d} {label}", sql))
+    return queries
+
+
+def explain(conn, sql):
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        return '; '.join(str(row[-1]) for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().fetchall()
+    return '; '.join(f"{row.get('table')}:{row.get('type')}:{row.get('key')}" for row in rows)
+
+
+def time_queries(engine, queries, repeat):
+    """Return {label: (median_ms, plan)} for each query"""
+    results = {}
+    with engine.connect() as conn:
+        for label, sql in queries:
+            try:
+                plan = explain(conn, sql)
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    conn.execute(text(sql)).fetchall()
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[label] = (statistics.median(timings), plan)
+            except Exception as e:
+                results[label] = (None, f"error: {str(e).splitlines()[0]}")
+    return results
+
+
+def analyze(engine):
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.execute(text("ANALYZE"))
+        else:
+            conn.execute(text("ANALYZE TABLE transactions"))
+
+
+def main():
+    args = parse_arguments()
+    rng = random.Random(args.seed)
+    engine = create_storage_engine(args.db_url)
+    table = SimulationLog.__table__
+
+    print(f"Recreating transactions table at {engine.url.render_as_string(hide_password=True)}")
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    for index in table.indexes:
+        index.drop(engine)
+
+    started = time.perf_counter()
+    devices = seed_rows(engine, args, rng)
+    print(f"Seeded {args.rows} rows in {time.perf_counter() - started:.1f} s")
+
+    queries = [(label, translate_sql(sql, engine.dialect.name))
+               for label, sql in build_queries(IoTQueryGenerator(), devices, rng)]
+
+    analyze(engine)
+    without_indexes = time_queries(engine, queries, args.repeat)
+
+    started = time.perf_counter()
+    for index in table.indexes:
+        index.create(engine)
+    print(f"Created {len(table.indexes)} indexes in {time.perf_counter() - started:.1f} s")
+
+    analyze(engine)
+    with_indexes = time_queries(engine, queries, args.repeat)
+
+    print()
+    print(f"{'pattern':<45} {'no index (ms)':>14} {'indexed (ms)':>13} {'speedup':>8}")
+    print("-" * 84)
+    for label, _ in queries:
+        before, _ = without_indexes[label]
+        after, plan = with_indexes[label]
+        if before is None or after is None:
+            print(f"{label:<45} {'-':>14} {'-':>13} {'-':>8}  {plan}")
+            continue
+        print(f"{label:<45} {before:>14.2f} {after:>13.2f} {before / after:>7.1f}x")
+        print(f"{'':<45} plan: {plan}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,131 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.types import TypeDecorator, VARBINARY
 from datetime import datetime
+import os
 
 # Initialize SQLAlchemy instance for database interaction
 db = SQLAlchemy()
 
+# How device_id/user_id are stored: 'hex' (String(130)) or 'binary' (raw bytes, half the size).
+# Only affects newly created tables; startup refuses to run against a table stored the other way.
+ID_STORAGE = os.environ.get('IOT_ID_STORAGE', 'hex')
+ID_MAX_HEX_LENGTH = 130
+
+if ID_STORAGE not in ('hex', 'binary'):
+    raise ValueError(f"IOT_ID_STORAGE must be 'hex' or 'binary', got '{ID_STORAGE}'")
+
+
+class HexBinary(TypeDecorator):
+    """Hex string on the Python side, raw bytes in the database"""
+    impl = VARBINARY
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return bytes.fromhex(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return bytes(value).hex()
+
+
+def id_column_type():
+    """Column type for device_id/user_id according to ID_STORAGE"""
+    if ID_STORAGE == 'binary':
+        return HexBinary(ID_MAX_HEX_LENGTH // 2)
+    return db.String(ID_MAX_HEX_LENGTH)
+
+
+def validate_id(value):
+    """
+    Check that a device/user ID can be stored with the configured ID storage
+    :param value: ID string
+    :return: The ID, lower-cased when stored as binary
+    :raises ValueError: If the ID is too long or (for binary storage) not valid hex
+    """
+    if len(value) > ID_MAX_HEX_LENGTH:
+        raise ValueError(f"ID longer than {ID_MAX_HEX_LENGTH} characters")
+    if ID_STORAGE == 'binary':
+        try:
+            bytes.fromhex(value)
+        except ValueError:
+            raise ValueError("ID must be an even-length hex string")
+        return value.lower()
+    return value
+
+
+# Device state fields stored in their own columns: name -> Python type
+STATE_COLUMNS = {
+    'power': str,
+    'brightness': int,
+    'color': str,
+    'mode': str,
+    'volume': int
+}
+
+
+def extract_state_columns(state):
+    """
+    Pull the typed state columns out of a device state dict
+    :param state: Device state dict (or anything else, which yields all NULLs)
+    :return: Dict with one entry per STATE_COLUMNS field
+    """
+    columns = dict.fromkeys(STATE_COLUMNS)
+    if not isinstance(state, dict):
+        return columns
+    for name, cast in STATE_COLUMNS.items():
+        value = state.get(name)
+        if value is None:
+            continue
+        try:
+            columns[name] = cast(value)
+        except (TypeError, ValueError):
+            pass
+    return columns
+
+
 # Define the SimulationLog model to represent logs in the database
 class SimulationLog(db.Model):
     __tablename__ = 'transactions'  # Table name in the database
+    # Indexes matching the query shapes generated by IoTQueryGenerator:
+    # equality filters on device_type/func/device_id/user_id, ordered by timestamp
+    __table_args__ = (
+        db.Index('ix_transactions_timestamp', 'timestamp'),
+        db.Index('ix_transactions_device_type_timestamp', 'device_type', 'timestamp'),
+        db.Index('ix_transactions_func_timestamp', 'func', 'timestamp'),
+        db.Index('ix_transactions_device_id_timestamp', 'device_id', 'timestamp'),
+        db.Index('ix_transactions_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_transactions_user_id_func_timestamp', 'user_id', 'func', 'timestamp'),
+        # Covers the "stats" pattern: WHERE device_type = ? GROUP BY value
+        db.Index('ix_transactions_device_type_value', 'device_type', 'value'),
+        # State distributions per device type (e.g. Light brightness) as covering index scans
+        db.Index('ix_transactions_device_type_power', 'device_type', 'power'),
+        db.Index('ix_transactions_device_type_brightness', 'device_type', 'brightness'),
+        db.Index('ix_transactions_device_type_color', 'device_type', 'color'),
+        db.Index('ix_transactions_device_type_mode', 'device_type', 'mode'),
+        db.Index('ix_transactions_device_type_volume', 'device_type', 'volume'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     device_type = db.Column(db.String(50), nullable=False)
-    device_id = db.Column(db.String(130), nullable=False)
-    user_id = db.Column(db.String(130), nullable=False)
+    device_id = db.Column(id_column_type(), nullable=False)
+    user_id = db.Column(id_column_type(), nullable=False)
     action = db.Column(db.String(50), nullable=False)
     value = db.Column(db.String(100), nullable=False)
     func = db.Column(db.String(50), nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     state = db.Column(db.String(500), nullable=False)
+    # Typed copies of the device state, populated at ingest (NULL when the device has no such field)
+    power = db.Column(db.String(10), nullable=True)
+    brightness = db.Column(db.SmallInteger, nullable=True)
+    color = db.Column(db.String(20), nullable=True)
+    mode = db.Column(db.String(20), nullable=True)
+    volume = db.Column(db.SmallInteger, nullable=True)
 
-    def __init__(self, device_type, device_id, user_id, action, value, func, timestamp, state):
+    def __init__(self, device_type, device_id, user_id, action, value, func, timestamp, state,
+                 power=None, brightness=None, color=None, mode=None, volume=None):
         self.device_type = device_type
         self.device_id = device_id
         self.user_id = user_id
@@ -27,6 +134,43 @@ class SimulationLog(db.Model):
         self.func = func
         self.timestamp = timestamp
         self.state = state
+        self.power = power
+        self.brightness = brightness
+        self.color = color
+        self.mode = mode
+        self.volume = volume
 
     def __repr__(self):
         return f"<SimulationLog {self.device_id} - {self.user_id} - {self.action} - {self.func}>"
+
+
+# Pre-aggregated event counts per time bucket, maintained by the ingest path
+class UsageRollup(db.Model):
+    __tablename__ = 'usage_rollups'
+    __table_args__ = (
+        db.Index('ix_usage_rollups_granularity_device_type_bucket', 'granularity', 'device_type', 'bucket'),
+        db.Index('ix_usage_rollups_granularity_func_bucket', 'granularity', 'func', 'bucket'),
+    )
+
+    granularity = db.Column(db.String(5), primary_key=True)  # 'hour', 'day' or 'month'
+    bucket = db.Column(db.DateTime, primary_key=True)        # Start of the bucket
+    device_type = db.Column(db.String(50), primary_key=True)
+    func = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(100), primary_key=True)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UsageRollup {self.granularity} {self.bucket} - {self.device_type} - {self.func} - {self.value}: {self.event_count}>"
+
+
+# Single-row counter bumped in every transaction that changes transactions (ingest, retention);
+# readers such as the query API's result cache compare it to detect new data
+class IngestWatermark(db.Model):
+    __tablename__ = 'ingest_watermark'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Always WATERMARK_ROW_ID
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IngestWatermark {self.version} at {self.updated_at}>"
@@ -0,0 +1,258 @@
+# backend/ingest.py
+
+import logging
+import json
+import gzip
+import time
+from datetime import datetime
+
+from backend.database import db, SimulationLog, validate_id, extract_state_columns
+from backend.rollups import update_rollups
+from backend.watermark import bump_watermark
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+
+REQUIRED_FIELDS = ('device_type', 'device_id', 'user_id', 'action', 'value', 'func', 'timestamp', 'state')
+
+# Sizes of the transactions columns: an oversized value would be truncated (or fail the whole
+# batch on a strict MySQL server), so such rows are rejected in parse_log instead
+STRING_LENGTHS = {
+    column.name: column.type.length for column in SimulationLog.__table__.columns
+    if isinstance(column.type, db.String) and column.type.length
+}
+SMALLINT_COLUMNS = [
+    column.name for column in SimulationLog.__table__.columns if isinstance(column.type, db.SmallInteger)
+]
+SMALLINT_RANGE = (-32768, 32767)
+
+
+class IngestError(Exception):
+    """Raised when a streaming ingest fails part-way; carries the stats of the batches already committed"""
+    def __init__(self, message, stats):
+        super().__init__(message)
+        self.stats = stats
+
+
+def parse_timestamp(value):
+    """
+    Parse a log timestamp sent by the simulator
+    :param value: ISO format string or datetime
+    :return: datetime
+    :raises ValueError: If the value cannot be parsed
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    raise ValueError(f"unsupported timestamp type: {type(value).__name__}")
+
+
+def parse_log(log):
+    """
+    Validate a single log and convert it into a row for the transactions table
+    :param log: Log dict as produced by the simulator
+    :return: Row dict ready for a Core insert
+    :raises ValueError: If a required field is missing or malformed, or does not fit its column
+    """
+    if not isinstance(log, dict):
+        raise ValueError("log must be an object")
+
+    missing = [field for field in REQUIRED_FIELDS if field not in log]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    for field in ('device_type', 'device_id', 'user_id', 'action', 'func'):
+        if not isinstance(log[field], str) or not log[field]:
+            raise ValueError(f"{field} must be a non-empty string")
+
+    state = log['state']
+    row = {
+        'device_type': log['device_type'],
+        'device_id': validate_id(log['device_id']),
+        'user_id': validate_id(log['user_id']),
+        'action': log['action'],
+        'value': str(log['value']),
+        'func': log['func'],
+        'timestamp': parse_timestamp(log['timestamp']),
+        'state': json.dumps(state) if isinstance(state, dict) else str(state)
+    }
+    row.update(extract_state_columns(state))
+
+    for name, length in STRING_LENGTHS.items():
+        if isinstance(row[name], str) and len(row[name]) > length:
+            raise ValueError(f"{name} is longer than {length} characters")
+    for name in SMALLINT_COLUMNS:
+        if row[name] is not None and not SMALLINT_RANGE[0] <= row[name] <= SMALLINT_RANGE[1]:
+            raise ValueError(f"{name} is out of range: {row[name]}")
+    return row
+
+
+def parse_logs(logs, offset=0):
+    """
+    Parse a batch of logs, collecting invalid entries instead of failing the batch
+    :param logs: List of log dicts
+    :param offset: Index of the first log within the whole request (used in error reports)
+    :return: Tuple of (rows, errors)
+    """
+    rows = []
+    errors = []
+    for index, log in enumerate(logs, start=offset):
+        try:
+            rows.append(parse_log(log))
+        except (ValueError, TypeError) as e:
+            errors.append({"index": index, "error": str(e)})
+    return rows, errors
+
+
+def insert_rows(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert parsed rows with chunked multi-row inserts (no ORM objects, no commit)
+    :param rows: Row dicts from parse_log
+    :param chunk_size: Number of rows per INSERT statement
+    :return: List of per-chunk stats
+    """
+    table = SimulationLog.__table__
+    chunks = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        started = time.perf_counter()
+        db.session.execute(table.insert(), chunk)
+        chunks.append({
+            "rows": len(chunk),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        })
+    return chunks
+
+
+def save_logs(logs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate and store a batch of simulation logs in a single transaction
+    :param logs: List of log dicts
+    :param chunk_size: Number of rows per INSERT statement
+    :return: Ingest stats (accepted/rejected counts and per-chunk timing)
+    """
+    started = time.perf_counter()
+    rows, errors = parse_logs(logs)
+    parse_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        chunks = insert_rows(rows, chunk_size)
+        rollup_started = time.perf_counter()
+        update_rollups(db.session, rows)
+        rollup_ms = (time.perf_counter() - rollup_started) * 1000
+        if rows:
+            bump_watermark(db.session)
+        db.session.commit()
+    except Exception as e:
+        logging.error(f"Error saving logs to database: {e}")
+        db.session.rollback()
+        raise
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logging.info(f"Saved {len(rows)} logs in {len(chunks)} chunks ({len(errors)} rejected) in {elapsed_ms:.1f} ms")
+
+    return {
+        "received": len(logs),
+        "accepted": len(rows),
+        "rejected": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "parse_ms": round(parse_ms, 3),
+        "rollup_ms": round(rollup_ms, 3),
+        "elapsed_ms": round(elapsed_ms, 3)
+    }
+
+
+def iter_ndjson(stream, gzipped=False):
+    """
+    Read newline-delimited JSON incrementally from a binary stream
+    :param stream: File-like object (e.g. the Flask request stream)
+    :param gzipped: Whether the stream is gzip-compressed
+    :return: Generator of (line_number, log, error) tuples; exactly one of log/error is None
+    """
+    if gzipped:
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f"invalid JSON: {e}"
+
+
+def ingest_stream(stream, batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE, gzipped=False):
+    """
+    Ingest an NDJSON stream of logs, committing every batch_size lines so memory stays bounded
+    :param stream: Binary file-like object with one log per line
+    :param batch_size: Number of lines per committed batch
+    :param chunk_size: Number of rows per INSERT statement
+    :param gzipped: Whether the stream is gzip-compressed
+    :return: Ingest stats with per-batch accept/reject counts
+    :raises IngestError: If a batch cannot be written; earlier batches stay committed
+    """
+    started = time.perf_counter()
+    stats = {
+        "accepted": 0,
+        "rejected": 0,
+        "errors": [],
+        "batch_size": batch_size,
+        "batches": []
+    }
+    rows = []
+    rejected = 0
+
+    def flush():
+        batch_started = time.perf_counter()
+        try:
+            insert_rows(rows, chunk_size)
+            update_rollups(db.session, rows)
+            if rows:
+                bump_watermark(db.session)
+            db.session.commit()
+        except Exception as e:
+            logging.error(f"Error saving batch {len(stats['batches']) + 1} to database: {e}")
+            db.session.rollback()
+            raise IngestError(f"Database error: {e}", stats) from e
+        stats["accepted"] += len(rows)
+        stats["rejected"] += rejected
+        stats["batches"].append({
+            "batch": len(stats["batches"]) + 1,
+            "accepted": len(rows),
+            "rejected": rejected,
+            "elapsed_ms": round((time.perf_counter() - batch_started) * 1000, 3)
+        })
+
+    try:
+        for line_number, log, error in iter_ndjson(stream, gzipped):
+            if error is None:
+                try:
+                    rows.append(parse_log(log))
+                except (ValueError, TypeError) as e:
+                    error = str(e)
+            if error is not None:
+                rejected += 1
+                if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                    stats["errors"].append({"line": line_number, "error": error})
+
+            if len(rows) + rejected >= batch_size:
+                flush()
+                rows = []
+                rejected = 0
+    except (OSError, EOFError) as e:
+        # Truncated or corrupt gzip stream: keep what was already committed
+        logging.error(f"Error reading ingest stream: {e}")
+        raise IngestError(f"Error reading stream: {e}", stats) from e
+
+    if rows or rejected:
+        flush()
+
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    logging.info(f"Streamed {stats['accepted']} logs in {len(stats['batches'])} batches "
+                 f"({stats['rejected']} rejected) in {stats['elapsed_ms']:.1f} ms")
+    return stats
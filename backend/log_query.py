@@ -0,0 +1,157 @@
+# backend/log_query.py
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import select, func, and_, or_
+
+from backend.database import db, SimulationLog, STATE_COLUMNS
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Columns that can be requested through ?fields=
+LOG_FIELDS = ('id', 'device_type', 'device_id', 'user_id', 'action', 'value', 'func', 'timestamp', 'state') + tuple(STATE_COLUMNS)
+DEFAULT_FIELDS = tuple(field for field in LOG_FIELDS if field != 'state')
+
+# Query parameters that map to equality filters
+FILTER_FIELDS = ('device_type', 'device_id', 'user_id', 'func')
+
+
+def encode_cursor(timestamp, log_id):
+    """
+    Build an opaque cursor pointing just after the given row
+    :param timestamp: Timestamp of the last row on the page
+    :param log_id: Id of the last row on the page
+    :return: URL-safe cursor string
+    """
+    raw = json.dumps([timestamp.isoformat(), log_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+    :param cursor: Cursor string
+    :return: Tuple of (timestamp, id)
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, log_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def parse_fields(value):
+    """
+    Parse the ?fields= projection
+    :param value: Comma separated field names or None
+    :return: Tuple of field names
+    :raises ValueError: If an unknown field is requested
+    """
+    if not value:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in LOG_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def fetch_logs_page(fields=DEFAULT_FIELDS, filters=None, start=None, end=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of logs ordered by (timestamp, id) descending using keyset pagination
+    :param fields: Fields to return
+    :param filters: Dict of equality filters (see FILTER_FIELDS)
+    :param start: Inclusive lower bound on timestamp
+    :param end: Exclusive upper bound on timestamp
+    :param cursor: Decoded cursor (timestamp, id) from the previous page
+    :param limit: Page size
+    :return: Tuple of (rows as dicts, next cursor or None)
+    """
+    columns = {field: getattr(SimulationLog, field) for field in fields}
+    # The cursor always needs the sort key, even when it is not projected
+    query_columns = list(columns.values())
+    for key in ('timestamp', 'id'):
+        if key not in columns:
+            query_columns.append(getattr(SimulationLog, key))
+
+    query = select(*query_columns)
+
+    conditions = [getattr(SimulationLog, field) == value for field, value in (filters or {}).items()]
+    if start is not None:
+        conditions.append(SimulationLog.timestamp >= start)
+    if end is not None:
+        conditions.append(SimulationLog.timestamp < end)
+    if cursor is not None:
+        cursor_timestamp, cursor_id = cursor
+        conditions.append(or_(
+            SimulationLog.timestamp < cursor_timestamp,
+            and_(SimulationLog.timestamp == cursor_timestamp, SimulationLog.id < cursor_id)
+        ))
+    if conditions:
+        query = query.where(and_(*conditions))
+
+    query = query.order_by(SimulationLog.timestamp.desc(), SimulationLog.id.desc()).limit(limit + 1)
+    result = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(result) > limit:
+        result = result[:limit]
+        last = result[-1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+
+    logs_data = []
+    for row in result:
+        log = {}
+        for field in fields:
+            value = getattr(row, field)
+            if field == 'timestamp':
+                value = value.isoformat()
+            elif field == 'state':
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            log[field] = value
+        logs_data.append(log)
+
+    return logs_data, next_cursor
+
+
+def state_distribution(field, device_type=None, start=None, end=None):
+    """
+    Count rows per value of a typed state column, grouped in the database
+    :param field: One of STATE_COLUMNS
+    :param device_type: Optional device type filter
+    :param start: Inclusive lower bound on timestamp
+    :param end: Exclusive upper bound on timestamp
+    :return: List of {value, count, percentage} ordered by count descending
+    """
+    if field not in STATE_COLUMNS:
+        raise ValueError(f"field must be one of: {', '.join(STATE_COLUMNS)}")
+
+    column = getattr(SimulationLog, field)
+    count = func.count().label('count')
+    query = select(column.label('value'), count).where(column.isnot(None))
+    if device_type:
+        query = query.where(SimulationLog.device_type == device_type)
+    if start is not None:
+        query = query.where(SimulationLog.timestamp >= start)
+    if end is not None:
+        query = query.where(SimulationLog.timestamp < end)
+    query = query.group_by(column).order_by(count.desc())
+
+    rows = db.session.execute(query).all()
+    total = sum(row.count for row in rows)
+    return [
+        {
+            "value": row.value,
+            "count": row.count,
+            "percentage": round(row.count * 100.0 / total, 2)
+        }
+        for row in rows
+    ]
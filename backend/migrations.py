@@ -0,0 +1,196 @@
+# backend/migrations.py
+
+import logging
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect, select, update, bindparam, text, String
+from sqlalchemy.schema import CreateColumn
+
+from backend.database import db, SimulationLog, ID_STORAGE, STATE_COLUMNS, extract_state_columns
+from backend.rollups import count_rollups, upsert_rollup_counts
+from backend.partitions import partition_table
+from backend.watermark import ensure_watermark
+
+# Applied migrations are recorded here; missing versions are applied on startup
+schema_version = db.Table(
+    'schema_version',
+    db.Column('version', db.Integer, primary_key=True, autoincrement=False),
+    db.Column('description', db.String(200), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+
+def create_missing_indexes(conn, table, names):
+    """
+    Create indexes declared on the model that do not exist in the database yet
+    :param conn: Connection inside a migration transaction
+    :param table: SQLAlchemy Table
+    :param names: Names of the model indexes this migration introduces
+    """
+    existing = {index['name'] for index in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name in names and index.name not in existing:
+            logging.info(f"Creating index {index.name} on {table.name}")
+            index.create(conn)
+
+
+def add_missing_column(conn, table, column_name):
+    """
+    Add a column declared on the model to an existing table
+    :param conn: Connection inside a migration transaction
+    :param table: SQLAlchemy Table
+    :param column_name: Name of the model column to add
+    """
+    existing = {column['name'] for column in inspect(conn).get_columns(table.name)}
+    if column_name in existing:
+        return
+    column_ddl = CreateColumn(table.c[column_name]).compile(dialect=conn.dialect)
+    logging.info(f"Adding column {column_name} to {table.name}")
+    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+
+def migration_0001_transactions_indexes(conn):
+    create_missing_indexes(conn, SimulationLog.__table__, {
+        'ix_transactions_timestamp',
+        'ix_transactions_device_type_timestamp',
+        'ix_transactions_func_timestamp',
+        'ix_transactions_device_id_timestamp',
+        'ix_transactions_user_id_timestamp',
+        'ix_transactions_user_id_func_timestamp',
+        'ix_transactions_device_type_value',
+    })
+
+
+def migration_0002_state_columns(conn, batch_size=5000):
+    table = SimulationLog.__table__
+    for name in STATE_COLUMNS:
+        add_missing_column(conn, table, name)
+    create_missing_indexes(conn, table, {f'ix_transactions_device_type_{name}' for name in STATE_COLUMNS})
+
+    # Backfill the new columns from the JSON state of existing rows
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam('row_id'))
+        .values({name: bindparam(name) for name in STATE_COLUMNS})
+    )
+    last_id = 0
+    backfilled = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.state)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            try:
+                state = json.loads(row.state)
+            except ValueError:
+                state = None
+            params.append({'row_id': row.id, **extract_state_columns(state)})
+        conn.execute(statement, params)
+        backfilled += len(rows)
+        last_id = rows[-1].id
+    if backfilled:
+        logging.info(f"Backfilled state columns for {backfilled} rows")
+
+
+def migration_0003_usage_rollups(conn, batch_size=50000):
+    # usage_rollups itself is created with the other missing tables; fill it from existing rows
+    table = SimulationLog.__table__
+    last_id = 0
+    counted = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.timestamp, table.c.device_type, table.c.func, table.c.value)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        upsert_rollup_counts(conn, conn.dialect.name, count_rollups(rows))
+        counted += len(rows)
+        last_id = rows[-1].id
+    if counted:
+        logging.info(f"Built usage rollups from {counted} rows")
+
+
+def migration_0004_partition_transactions(conn):
+    # MySQL only; other backends keep a single table and use DELETE-based retention
+    partition_table(conn)
+
+
+def migration_0005_ingest_watermark(conn):
+    # The table is created with the other missing tables; seed its single row
+    ensure_watermark(conn)
+
+
+# (version, description, function) in the order they must be applied.
+# Every migration must be idempotent: on a fresh database the tables are created from
+# the current models first, so the migration only finds nothing left to do.
+MIGRATIONS = [
+    (1, "Add transactions indexes for generated query shapes", migration_0001_transactions_indexes),
+    (2, "Add typed state columns to transactions", migration_0002_state_columns),
+    (3, "Build hourly/daily/monthly usage rollups", migration_0003_usage_rollups),
+    (4, "Partition transactions by month", migration_0004_partition_transactions),
+    (5, "Add ingest watermark for query result caching", migration_0005_ingest_watermark),
+]
+
+
+def verify_id_storage(engine):
+    """
+    Make sure the existing transactions table stores IDs the way IOT_ID_STORAGE says
+    :param engine: SQLAlchemy engine
+    :raises RuntimeError: If the table was created with the other ID storage
+    """
+    columns = {column['name']: column for column in inspect(engine).get_columns(SimulationLog.__tablename__)}
+    for name in ('device_id', 'user_id'):
+        column_type = columns[name]['type']
+        stored_as_binary = not isinstance(column_type, String)
+        if stored_as_binary != (ID_STORAGE == 'binary'):
+            raise RuntimeError(
+                f"{SimulationLog.__tablename__}.{name} is stored as {column_type} but IOT_ID_STORAGE={ID_STORAGE}; "
+                f"use the matching IOT_ID_STORAGE or recreate the table"
+            )
+
+
+def run_migrations(engine=None):
+    """
+    Create missing tables and apply pending migrations without touching existing data
+    :param engine: SQLAlchemy engine, defaults to the Flask-SQLAlchemy engine
+    :return: Current schema version
+    """
+    engine = engine or db.engine
+    started = time.perf_counter()
+
+    existing_tables = set(inspect(engine).get_table_names())
+    missing_tables = [table for table in db.metadata.sorted_tables if table.name not in existing_tables]
+    if missing_tables:
+        db.metadata.create_all(engine, tables=missing_tables)
+        logging.info(f"Created tables: {', '.join(table.name for table in missing_tables)}")
+    verify_id_storage(engine)
+
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_version.c.version)).scalars())
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        logging.info(f"Applying migration {version}: {description}")
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(schema_version.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.utcnow()
+            ))
+
+    current = max([version for version, _, _ in MIGRATIONS], default=0)
+    logging.info(f"Database schema at version {current} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+    return current
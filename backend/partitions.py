@@ -0,0 +1,240 @@
+# backend/partitions.py
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import text, select, func, inspect
+
+from backend.database import SimulationLog
+from backend.watermark import bump_watermark
+from backend.rollups import trim_rollups
+
+TABLE_NAME = SimulationLog.__tablename__
+MAX_PARTITION = 'pmax'
+# Rows older than MAX_BACKFILL_MONTHS months share one leading partition, so an outlier
+# timestamp (e.g. 1970) cannot push the table past MySQL's 8192-partition limit
+OLD_PARTITION = 'p_old'
+MAX_BACKFILL_MONTHS = 24
+DEFAULT_MONTHS_AHEAD = 3
+DELETE_BATCH_SIZE = 10000
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(month):
+    """Partition holding the rows of the given month, e.g. p202412"""
+    return f"p{month:%Y%m}"
+
+
+def partition_month(name):
+    return datetime.strptime(name[1:], '%Y%m')
+
+
+def partition_definition(month, name=None):
+    """
+    Partition clause for the rows before the end of the given month
+    :param month: First day of the month
+    :param name: Partition name (default: the month's name, e.g. p202412)
+    """
+    name = name or partition_name(month)
+    return f"PARTITION {name} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d %H:%M:%S}')"
+
+
+def partition_upper_bound(partitions, index):
+    """
+    Exclusive upper bound of the rows in partitions[index]
+    :param partitions: Partition names in order (as returned by get_partitions)
+    :param index: Index of the partition
+    :return: The next month for a monthly partition, the first monthly partition's month for p_old
+    """
+    if partitions[index] == OLD_PARTITION:
+        return partition_month(partitions[index + 1])
+    return add_months(partition_month(partitions[index]), 1)
+
+
+def initial_partitions(oldest, current, months_ahead=DEFAULT_MONTHS_AHEAD, max_backfill=MAX_BACKFILL_MONTHS):
+    """
+    Partition clauses for partitioning an existing table
+    One partition per month from the oldest row (at most max_backfill months back) to
+    months_ahead months after the current one; older rows go into p_old, newer ones into pmax.
+    :param oldest: Oldest timestamp in the table (None if empty)
+    :param current: First day of the current month
+    :param months_ahead: Number of future months to create partitions for
+    :param max_backfill: Number of past months that get their own partition
+    :return: List of PARTITION clauses
+    """
+    first = add_months(current, -max_backfill)
+    month = month_start(oldest) if oldest and oldest < current else current
+    definitions = []
+    if month < first:
+        logging.warning(f"Oldest {TABLE_NAME} row is from {oldest:%Y-%m}; rows before {first:%Y-%m} "
+                        f"are kept in a single {OLD_PARTITION} partition")
+        definitions.append(partition_definition(add_months(first, -1), OLD_PARTITION))
+        month = first
+
+    last = add_months(current, months_ahead)
+    while month <= last:
+        definitions.append(partition_definition(month))
+        month = add_months(month, 1)
+    definitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return definitions
+
+
+def supports_partitioning(conn):
+    return conn.dialect.name == 'mysql'
+
+
+def get_partitions(conn):
+    """
+    List the partitions of the transactions table
+    :param conn: MySQL connection
+    :return: Partition names in order (p_old if present, then the monthly ones, without pmax);
+             empty if the table is not partitioned
+    """
+    rows = conn.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {'table': TABLE_NAME}).scalars().all()
+    return [name for name in rows if name != MAX_PARTITION]
+
+
+def partition_table(conn, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """
+    Partition the transactions table by month of timestamp (MySQL RANGE COLUMNS)
+    :param conn: Connection inside a migration transaction
+    :param months_ahead: Number of future months to create partitions for
+    """
+    if not supports_partitioning(conn) or get_partitions(conn):
+        return
+
+    table = SimulationLog.__table__
+    oldest = conn.execute(select(func.min(table.c.timestamp))).scalar()
+    definitions = initial_partitions(oldest, month_start(datetime.now()), months_ahead)
+
+    # Every unique key of a partitioned table must contain the partitioning column
+    logging.info(f"Partitioning {TABLE_NAME} into {len(definitions)} partitions")
+    conn.execute(text(f"ALTER TABLE {TABLE_NAME} DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)"))
+    conn.execute(text(
+        f"ALTER TABLE {TABLE_NAME} PARTITION BY RANGE COLUMNS(timestamp) ({', '.join(definitions)})"
+    ))
+
+
+def ensure_partitions(conn, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """
+    Split pmax so that the next months_ahead months have their own partition
+    :param conn: Database connection
+    :param months_ahead: Number of future months that must have a partition
+    :return: Names of the partitions created
+    """
+    if not supports_partitioning(conn):
+        return []
+    partitions = get_partitions(conn)
+    if not partitions:
+        return []
+
+    month = add_months(partition_month(partitions[-1]), 1)
+    last = add_months(month_start(datetime.now()), months_ahead)
+    new_months = []
+    while month <= last:
+        new_months.append(month)
+        month = add_months(month, 1)
+    if not new_months:
+        return []
+
+    definitions = [partition_definition(month) for month in new_months]
+    definitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    conn.execute(text(
+        f"ALTER TABLE {TABLE_NAME} REORGANIZE PARTITION {MAX_PARTITION} INTO ({', '.join(definitions)})"
+    ))
+    created = [partition_name(month) for month in new_months]
+    logging.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+def archive_table_name(partition, existing_tables):
+    """
+    Name of the archive table for a partition: transactions_<partition>, with a numeric
+    suffix when an earlier archive of the same month already exists
+    :param partition: Partition name, e.g. p202401
+    :param existing_tables: Names of the tables already in the database
+    :return: Unused table name
+    """
+    name = f"{TABLE_NAME}_{partition}"
+    suffix = 1
+    while name in existing_tables:
+        suffix += 1
+        name = f"{TABLE_NAME}_{partition}_{suffix}"
+    return name
+
+
+def apply_retention(conn, keep_months, archive=False):
+    """
+    Remove data older than keep_months whole months
+    On MySQL whole partitions are dropped (or exchanged into transactions_<partition>
+    archive tables first, suffixed _2, _3... if that name is taken); other backends fall
+    back to range DELETEs committed batch by batch, so locks and the write-ahead log stay bounded. Rollup buckets before the cutoff are deleted
+    in the last transaction, so stats answered from usage_rollups never count expired rows.
+    :param conn: Database connection outside a begin() block; it is committed by this function
+    :param keep_months: Number of months to keep, including the current one (at least 1)
+    :param archive: Keep the removed rows in per-partition archive tables (MySQL only)
+    :return: Dict with the partitions dropped/archived, the rows deleted and the rollup rows deleted
+    """
+    if keep_months < 1:
+        raise ValueError(f"keep_months must be at least 1, got {keep_months}")
+    cutoff = add_months(month_start(datetime.now()), -(keep_months - 1))
+    result = {"cutoff": cutoff.isoformat(), "dropped": [], "archived": [], "deleted_rows": 0, "deleted_rollups": 0}
+
+    partitions = get_partitions(conn) if supports_partitioning(conn) else []
+    if archive and not partitions:
+        raise ValueError(
+            f"Archiving needs a partitioned MySQL {TABLE_NAME} table "
+            f"(this is an unpartitioned {conn.dialect.name} table); run without --archive to delete expired rows"
+        )
+
+    if partitions:
+        expired = [name for index, name in enumerate(partitions) if partition_upper_bound(partitions, index) <= cutoff]
+        existing_tables = set(inspect(conn).get_table_names()) if archive else set()
+        for name in expired:
+            if archive:
+                archive_table = archive_table_name(name, existing_tables)
+                existing_tables.add(archive_table)
+                conn.execute(text(f"CREATE TABLE {archive_table} LIKE {TABLE_NAME}"))
+                conn.execute(text(f"ALTER TABLE {archive_table} REMOVE PARTITIONING"))
+                conn.execute(text(f"ALTER TABLE {TABLE_NAME} EXCHANGE PARTITION {name} WITH TABLE {archive_table}"))
+                result["archived"].append(archive_table)
+            conn.execute(text(f"ALTER TABLE {TABLE_NAME} DROP PARTITION {name}"))
+            result["dropped"].append(name)
+        result["deleted_rollups"] = trim_rollups(conn, cutoff)
+        if expired or result["deleted_rollups"]:
+            bump_watermark(conn)
+        conn.commit()
+        logging.info(f"Retention dropped partitions before {cutoff:%Y-%m}: {result['dropped']}")
+        return result
+
+    # No partitions: delete in bounded batches through the timestamp index, one transaction per batch
+    table = SimulationLog.__table__
+    while True:
+        ids = conn.execute(
+            select(table.c.id).where(table.c.timestamp < cutoff).limit(DELETE_BATCH_SIZE)
+        ).scalars().all()
+        if ids:
+            conn.execute(table.delete().where(table.c.id.in_(ids)))
+            result["deleted_rows"] += len(ids)
+        last_batch = len(ids) < DELETE_BATCH_SIZE
+        deleted_rollups = trim_rollups(conn, cutoff) if last_batch else 0
+        result["deleted_rollups"] = deleted_rollups
+        if ids or deleted_rollups:
+            bump_watermark(conn)
+        conn.commit()
+        if last_batch:
+            break
+    logging.info(f"Retention deleted {result['deleted_rows']} rows before {cutoff:%Y-%m}")
+    return result
@@ -0,0 +1,94 @@
+# backend/rollups.py
+
+from collections import Counter
+
+from sqlalchemy.dialects import mysql, sqlite
+
+from backend.database import UsageRollup
+
+# Bucket start for each rollup granularity
+GRANULARITIES = {
+    'hour': lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    'day': lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+    'month': lambda ts: ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+}
+
+
+def count_rollups(rows, counts=None):
+    """
+    Aggregate rows into rollup counts
+    :param rows: Iterable of row dicts or row objects with timestamp, device_type, func and value
+    :param counts: Existing Counter to add to
+    :return: Counter keyed by (granularity, bucket, device_type, func, value)
+    """
+    counts = Counter() if counts is None else counts
+    for row in rows:
+        if isinstance(row, dict):
+            timestamp, device_type, func, value = row['timestamp'], row['device_type'], row['func'], row['value']
+        else:
+            timestamp, device_type, func, value = row.timestamp, row.device_type, row.func, row.value
+        for granularity, truncate in GRANULARITIES.items():
+            counts[(granularity, truncate(timestamp), device_type, func, value)] += 1
+    return counts
+
+
+def upsert_rollup_counts(executor, dialect_name, counts):
+    """
+    Add counts to the rollup table, creating missing buckets
+    :param executor: Session or Connection used for the write (the caller commits)
+    :param dialect_name: Name of the database dialect ('mysql' or 'sqlite')
+    :param counts: Counter from count_rollups
+    """
+    if not counts:
+        return
+
+    table = UsageRollup.__table__
+    params = [
+        {
+            'granularity': granularity,
+            'bucket': bucket,
+            'device_type': device_type,
+            'func': func,
+            'value': value,
+            'event_count': count
+        }
+        for (granularity, bucket, device_type, func, value), count in counts.items()
+    ]
+
+    if dialect_name == 'mysql':
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            event_count=table.c.event_count + statement.inserted.event_count
+        )
+    elif dialect_name == 'sqlite':
+        statement = sqlite.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key.columns],
+            set_={'event_count': table.c.event_count + statement.excluded.event_count}
+        )
+    else:
+        raise NotImplementedError(f"Rollup upsert is not supported for dialect '{dialect_name}'")
+
+    executor.execute(statement, params)
+
+
+def update_rollups(session, rows):
+    """
+    Add freshly ingested rows to the rollup table inside the ingest transaction
+    :param session: SQLAlchemy session (the caller commits)
+    :param rows: Row dicts from parse_log
+    """
+    upsert_rollup_counts(session, session.get_bind().dialect.name, count_rollups(rows))
+
+
+def trim_rollups(executor, cutoff):
+    """
+    Delete rollup buckets that start before the retention cutoff, so rollup answers match
+    the raw transactions table after retention (cutoff is a month start, so every hour/day/month
+    bucket is either fully expired or fully kept)
+    :param executor: Session or Connection inside the retention transaction (the caller commits)
+    :param cutoff: First kept month (datetime)
+    :return: Number of rollup rows deleted
+    """
+    table = UsageRollup.__table__
+    return executor.execute(table.delete().where(table.c.bucket < cutoff)).rowcount
@@ -0,0 +1,107 @@
+# backend/storage.py
+"""
+Storage backend shared by the Flask ingest app, the FastAPI query API and SQLExecutor.
+
+The database is chosen with IOT_DATABASE_URL (a MySQL or SQLite SQLAlchemy URL). MySQL is the default;
+an embedded SQLite file (e.g. sqlite:///iotlogs.db) runs the whole pipeline without a
+server. SQLite connections are switched to WAL mode and the MySQL-dialect SQL produced by
+the model is translated before it is executed.
+"""
+
+import os
+import re
+
+from sqlalchemy import create_engine, event, text
+
+DEFAULT_DATABASE_URL = "mysql+pymysql://root:@localhost/iotlogs"
+
+# Dialects with a rollup upsert (backend/rollups.py) and model SQL translation (translate_sql)
+SUPPORTED_DIALECTS = ('mysql', 'sqlite')
+
+# The ingest_watermark table holds a single row (see backend/watermark.py)
+WATERMARK_ROW_ID = 1
+
+# MySQL DATE_FORMAT specifiers -> SQLite strftime specifiers
+_DATE_FORMAT_SPECIFIERS = {
+    '%Y': '%Y', '%m': '%m', '%d': '%d', '%H': '%H', '%i': '%M', '%s': '%S', '%S': '%S', '%j': '%j'
+}
+
+_SQLITE_REWRITES = [
+    (re.compile(r"\bHOUR\(\s*([\w.]+)\s*\)", re.IGNORECASE), r"CAST(strftime('%H', \1) AS INTEGER)"),
+    (re.compile(r"\bYEAR\(\s*([\w.]+)\s*\)", re.IGNORECASE), r"CAST(strftime('%Y', \1) AS INTEGER)"),
+    (re.compile(r"\bMONTH\(\s*([\w.]+)\s*\)", re.IGNORECASE), r"CAST(strftime('%m', \1) AS INTEGER)"),
+    (re.compile(r"\bUNHEX\(\s*'([0-9a-fA-F]*)'\s*\)", re.IGNORECASE), r"X'\1'"),
+    (re.compile(r"\bAS\s+SIGNED\b", re.IGNORECASE), "AS INTEGER"),
+]
+_DATE_FORMAT_PATTERN = re.compile(r"\bDATE_FORMAT\(\s*([\w.]+)\s*,\s*'([^']*)'\s*\)", re.IGNORECASE)
+
+
+def get_database_url():
+    """Database URL shared by all services"""
+    return os.environ.get('IOT_DATABASE_URL', DEFAULT_DATABASE_URL)
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets the query API read while the ingest app writes
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def configure_engine(engine):
+    """
+    Apply backend-specific connection settings to an engine
+    :param engine: SQLAlchemy engine
+    :return: The same engine
+    :raises ValueError: If the database is not one of SUPPORTED_DIALECTS
+    """
+    if engine.dialect.name not in SUPPORTED_DIALECTS:
+        raise ValueError(
+            f"Unsupported database '{engine.dialect.name}' in {engine.url.render_as_string(hide_password=True)}; "
+            f"IOT_DATABASE_URL must point to one of: {', '.join(SUPPORTED_DIALECTS)}"
+        )
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _on_sqlite_connect)
+    return engine
+
+
+def create_storage_engine(url=None, **kwargs):
+    """
+    Create a configured engine for the shared database
+    :param url: SQLAlchemy URL, defaults to get_database_url()
+    :return: SQLAlchemy engine
+    """
+    return configure_engine(create_engine(url or get_database_url(), **kwargs))
+
+
+def translate_sql(sql, dialect_name):
+    """
+    Translate MySQL-dialect SQL (as generated by the model) for another backend
+    :param sql: SQL text
+    :param dialect_name: Target dialect name ('mysql', 'sqlite')
+    :return: SQL text for the target backend
+    """
+    if dialect_name != 'sqlite':
+        return sql
+
+    def date_format(match):
+        fmt = re.sub(r"%[a-zA-Z]", lambda m: _DATE_FORMAT_SPECIFIERS.get(m.group(0), m.group(0)), match.group(2))
+        return f"strftime('{fmt}', {match.group(1)})"
+
+    sql = _DATE_FORMAT_PATTERN.sub(date_format, sql)
+    for pattern, replacement in _SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def read_ingest_watermark(conn):
+    """
+    Current ingest watermark, bumped by every ingest and retention transaction
+    :param conn: Database connection
+    :return: Watermark version, or None if the row does not exist
+    """
+    return conn.execute(
+        text("SELECT version FROM ingest_watermark WHERE id = :id"), {"id": WATERMARK_ROW_ID}
+    ).scalar()
@@ -0,0 +1,33 @@
+# backend/watermark.py
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from backend.database import IngestWatermark
+from backend.storage import WATERMARK_ROW_ID
+
+
+def ensure_watermark(executor):
+    """
+    Create the watermark row if it does not exist yet
+    :param executor: Session or Connection (the caller commits)
+    """
+    table = IngestWatermark.__table__
+    exists = executor.execute(select(table.c.id).where(table.c.id == WATERMARK_ROW_ID)).first()
+    if exists is None:
+        executor.execute(table.insert().values(id=WATERMARK_ROW_ID, version=0, updated_at=datetime.utcnow()))
+
+
+def bump_watermark(executor):
+    """
+    Advance the ingest watermark inside the transaction that changed the data,
+    so readers never see the new version before the rows are committed
+    :param executor: Session or Connection (the caller commits)
+    """
+    table = IngestWatermark.__table__
+    executor.execute(
+        table.update()
+        .where(table.c.id == WATERMARK_ROW_ID)
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
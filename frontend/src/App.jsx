@@ -8,6 +8,9 @@ import DevicesAnalytics from './components/dashboard/DevicesAnalytics';
 import UsersAnalytics from './components/dashboard/UsersAnalytics';
 import { useAIQuery } from './components/dashboard/useAIQuery';
 
+// 대시보드에 표시할 최신 로그 개수
+const LOGS_PAGE_SIZE = 500;
+
 const App = () => {
   const [activeTab, setActiveTab] = useState('overview');
   const [logs, setLogs] = useState([]); // raw 로그 데이터
@@ -21,7 +24,10 @@ const App = () => {
   const fetchData = async () => {
     try {
       setIsLoading(true);
-      const logsData = await getLogs();
+      const logsData = await getLogs({
+        limit: LOGS_PAGE_SIZE,
+        fields: ['id', 'device_type', 'device_id', 'user_id', 'action', 'value', 'func', 'timestamp', 'state']
+      });
       setLogs(logsData);
       setFetchError(null);
     } catch (err) {
@@ -1,8 +1,16 @@
 const API_BASE_URL = 'http://127.0.0.1:5000';
 
-export const getLogs = async () => {
+// params: { limit, cursor, fields, device_type, device_id, user_id, func, start, end }
+export const getLogs = async (params = {}) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/get_logs`, {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value === undefined || value === null || value === '') return;
+      query.append(key, Array.isArray(value) ? value.join(',') : value);
+    });
+    const queryString = query.toString();
+
+    const response = await fetch(`${API_BASE_URL}/get_logs${queryString ? `?${queryString}` : ''}`, {
       method: 'GET',
       headers: {
         'Accept': 'application/json',
@@ -0,0 +1,230 @@
+# simulator/async_shipper.py
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from log_api_handler import LogTransport
+
+DEFAULT_MAX_QUEUE = 10000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_REPORT_INTERVAL = 5.0
+
+# Let the flush loop run after this many events even if the queue never fills
+YIELD_EVERY = 100
+
+_STOP = object()
+
+
+class ShipperMetrics:
+    """Counters exposed by AsyncLogShipper"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retried = 0
+        self.flushes = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.producer_wait_s = 0.0  # Time the simulator spent blocked on a full queue
+        self.flush_latency_total_ms = 0.0
+        self.flush_latency_max_ms = 0.0
+
+    def record_flush(self, latency_ms):
+        self.flushes += 1
+        self.flush_latency_total_ms += latency_ms
+        self.flush_latency_max_ms = max(self.flush_latency_max_ms, latency_ms)
+
+    def snapshot(self, queue_depth):
+        return {
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retried": self.retried,
+            "flushes": self.flushes,
+            "flush_latency_avg_ms": round(self.flush_latency_total_ms / self.flushes, 2) if self.flushes else 0.0,
+            "flush_latency_max_ms": round(self.flush_latency_max_ms, 2),
+            "producer_wait_s": round(self.producer_wait_s, 3)
+        }
+
+
+class AsyncLogShipper:
+    """
+    Ships simulation events to the backend from an asyncio loop.
+    Events go through a bounded queue; a flush loop cuts batches on size or age and keeps
+    up to max_in_flight sends running in worker threads. When the backend falls behind the
+    queue fills up and put() blocks the producer (or drops events with drop_when_full).
+    """
+
+    def __init__(self, send=None, max_queue=DEFAULT_MAX_QUEUE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_in_flight=DEFAULT_MAX_IN_FLIGHT, drop_when_full=False):
+        """
+        :param send: Callable taking a list of log dicts; returns a falsy value on failure or a
+                     LogTransport summary dict (its 'retries' count is added to the metrics).
+                     Defaults to a LogTransport with max_in_flight pooled connections.
+        :param max_queue: Maximum events waiting in the queue
+        :param batch_size: Maximum events per send
+        :param flush_interval: Maximum seconds the oldest queued event waits before a flush
+        :param max_in_flight: Maximum concurrent sends
+        :param drop_when_full: Drop events instead of blocking the producer when the queue is full
+        """
+        self._transport = None
+        if send is None:
+            self._transport = LogTransport(concurrency=max_in_flight)
+            send = self._transport.send
+        self.send = send
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_in_flight = max_in_flight
+        self.drop_when_full = drop_when_full
+        self.metrics = ShipperMetrics()
+
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='log-shipper')
+        self._sends = set()
+        self._flusher = None
+
+    def start(self):
+        """Start the flush loop (must be called from the running event loop)"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return self
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def stats(self):
+        return self.metrics.snapshot(self._queue.qsize())
+
+    async def put(self, event):
+        """
+        Queue one event, waiting while the queue is full (backpressure)
+        :return: False if the event was dropped
+        """
+        metrics = self.metrics
+        if self._queue.full():
+            if self.drop_when_full:
+                metrics.dropped += 1
+                return False
+            started = time.perf_counter()
+            await self._queue.put(event)
+            metrics.producer_wait_s += time.perf_counter() - started
+        else:
+            self._queue.put_nowait(event)
+        metrics.enqueued += 1
+        metrics.max_queue_depth = max(metrics.max_queue_depth, self._queue.qsize())
+        return True
+
+    async def close(self):
+        """Flush everything still queued and wait for in-flight sends"""
+        self.start()
+        await self._queue.put(_STOP)
+        await self._flusher
+        if self._sends:
+            await asyncio.gather(*self._sends)
+        self._executor.shutdown(wait=True)
+        if self._transport is not None:
+            self._transport.close()
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Wait for a free send slot; meanwhile the queue absorbs new events
+            await self._slots.acquire()
+            task = asyncio.create_task(self._ship(batch))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _ship(self, batch):
+        metrics = self.metrics
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            logs = [event.to_dict() for event in batch]
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, self.send, logs)
+        except Exception as e:
+            logging.error(f"Log shipper send failed: {e}")
+            result = None
+        finally:
+            metrics.in_flight -= 1
+            self._slots.release()
+
+        metrics.record_flush((time.perf_counter() - started) * 1000)
+        if isinstance(result, dict):
+            metrics.retried += result.get('retries', 0)
+            if result.get('failed_chunks'):
+                result = None
+        if result:
+            metrics.sent += len(batch)
+        else:
+            metrics.failed += len(batch)
+
+
+async def ship_events(events, shipper, speed=None, report_interval=DEFAULT_REPORT_INTERVAL):
+    """
+    Pump a simulator event stream into a shipper, optionally paced to wall-clock time
+    :param events: Iterable of SimulationEvent in timestamp order
+    :param shipper: AsyncLogShipper
+    :param speed: None to generate as fast as backpressure allows, else simulated seconds per wall second
+    :param report_interval: Seconds between metric reports in the log
+    :return: Final shipper metrics
+    """
+    loop = asyncio.get_running_loop()
+
+    async def report():
+        while True:
+            await asyncio.sleep(report_interval)
+            logging.info(f"Shipper: {shipper.stats()}")
+
+    reporter = asyncio.create_task(report())
+    origin = None
+    try:
+        async with shipper:
+            for count, event in enumerate(events, start=1):
+                if speed:
+                    if origin is None:
+                        origin = (event.timestamp, loop.time())
+                    delay = origin[1] + (event.timestamp - origin[0]).total_seconds() / speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await shipper.put(event)
+                if count % YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+    finally:
+        reporter.cancel()
+
+    stats = shipper.stats()
+    logging.info(f"Shipper finished: {stats}")
+    return stats
@@ -0,0 +1,85 @@
+# simulator/bench_serialization.py
+"""
+Benchmark log serialization: the old process_log_data + json.dumps path used by
+send_log_to_backend against the single-pass encoders in serialization.py.
+
+    python simulator/bench_serialization.py --homes 100 --hours 24
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+import serialization
+from simulator import SmartHomeSimulator
+from log_api_handler import process_log_data
+from parallel import build_homes
+from run import HOME_LAYOUTS
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark simulator log serialization')
+    parser.add_argument('--homes', type=int, default=100, help='Number of simulated homes')
+    parser.add_argument('--hours', type=int, default=24, help='Simulated hours')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per encoder')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    return parser.parse_args()
+
+
+def time_encoder(encode, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = encode()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+
+def main():
+    args = parse_arguments()
+
+    simulator = SmartHomeSimulator(verbose=False, seed=args.seed)
+    for profile, device_types in build_homes(args.homes, HOME_LAYOUTS):
+        user_id = simulator.add_user(profile)
+        for device_type in device_types:
+            simulator.add_device(device_type, user_id)
+    columnar = simulator.simulate_vectorized(datetime(2024, 1, 1), args.hours, seed=args.seed)
+    logs = columnar.to_logs()
+    print(f"{len(logs)} logs from {len(simulator.devices)} devices")
+
+    tmp_dir = tempfile.mkdtemp()
+    parquet_path = os.path.join(tmp_dir, 'logs.parquet')
+
+    encoders = {
+        'process_log_data + json.dumps (old)': lambda: len(json.dumps({"logs": process_log_data(logs)}).encode('utf-8')),
+        'json + DateTimeEncoder, NDJSON': lambda: len(b''.join(
+            (serialization._json_encoder.encode(log) + '\n').encode('utf-8') for log in logs)),
+    }
+    if serialization.orjson is not None:
+        encoders['orjson NDJSON (encode_ndjson)'] = lambda: len(serialization.encode_ndjson(logs))
+    if serialization.msgpack is not None:
+        encoders['msgpack'] = lambda: len(serialization.encode_msgpack(logs))
+    if serialization.pa is not None:
+        def parquet(source):
+            serialization.write_parquet(source, parquet_path)
+            return os.path.getsize(parquet_path)
+        encoders['parquet from log dicts'] = lambda: parquet(logs)
+        encoders['parquet from ColumnarLogs'] = lambda: parquet(columnar)
+
+    print()
+    print(f"{'encoder':<40} {'ms':>10} {'logs/s':>12} {'MB':>8}")
+    print("-" * 73)
+    for name, encode in encoders.items():
+        elapsed, size = time_encoder(encode, args.repeat)
+        print(f"{name:<40} {elapsed * 1000:>10.1f} {len(logs) / elapsed:>12.0f} {size / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,29 @@
 
 import random
 
+from fleet import FleetDevice, COLORS, MODES
+
 # Possible states and actions for the light device
 light_states = {
     'power': ['on', 'off'],
     'brightness': range(0, 101),  # 0-100%
-    'color': ['red', 'green', 'blue', 'yellow', 'white'],  # Example color states
-    'mode': ['normal', 'night', 'reading', 'party']  # Different modes
+    'color': COLORS,  # Example color states
+    'mode': MODES  # Different modes
 }
 
-# Light device class
-class Light:
-    def __init__(self, device_id, user_id):
-        self.device_type = 'Light'
-        self.device_id = device_id
-        self.user_id = user_id
-        self.state = {
-            'power': 'off',  # Initial power state is 'off'
-            'brightness': 0,  # Initial brightness is 0
-            'color': 'white',  # Default color is white
-            'mode': 'normal'  # Default mode is normal
-        }
+# Light device class (a view over one row of a DeviceFleet)
+class Light(FleetDevice):
+    __slots__ = ()
+
+    device_type = 'Light'
+    initial_state = {
+        'power': 'off',  # Initial power state is 'off'
+        'brightness': 0,  # Initial brightness is 0
+        'color': 'white',  # Default color is white
+        'mode': 'normal'  # Default mode is normal
+    }
 
-    def generate_action(self, current_time):
+    def generate_action(self, current_time, rng=random):
         # Apply weights for actions based on time of day (e.g., used more frequently in the evening)
         hour = current_time.hour
         if 6 <= hour < 9:  # Morning
@@ -34,35 +35,37 @@ class Light:
             action_weights = {'power': 0.6, 'brightness': 0.2, 'setMode': 0.1, 'setColor': 0.1}
 
         # Choose an action based on the weighted probabilities
-        action = random.choices(list(action_weights.keys()), 
-                                list(action_weights.values()))[0]
+        action = rng.choices(list(action_weights.keys()), 
+                             list(action_weights.values()))[0]
 
         # Initialize the func variable
         func = None
         new_value = None
 
+        state = self.state
+
         # Generate new state based on selected action
         if action == 'power':
             # When turning on or off, set the appropriate action name
-            if self.state['power'] == 'off':
+            if state['power'] == 'off':
                 new_value = 'on'  # Power turned on
-                self.state['power'] = 'on'
+                state['power'] = 'on'
                 func = 'turnOn'  # func name for this action
             else:
                 new_value = 'off'  # Power turned off
-                self.state['power'] = 'off'
+                state['power'] = 'off'
                 func = 'turnOff'  # func name for this action
         elif action == 'brightness':
-            new_value = random.randint(0, 100)  # Random brightness between 0 and 100
-            self.state['brightness'] = new_value
+            new_value = rng.randint(0, 100)  # Random brightness between 0 and 100
+            state['brightness'] = new_value
             func = 'setBrightness'  # func name for brightness adjustment
         elif action == 'setMode':
-            new_value = random.choice(light_states['mode'])  # Random mode (e.g., night, reading, etc.)
-            self.state['mode'] = new_value
+            new_value = rng.choice(light_states['mode'])  # Random mode (e.g., night, reading, etc.)
+            state['mode'] = new_value
             func = 'setMode'  # func name for mode adjustment
         elif action == 'setColor':
-            new_value = random.choice(light_states['color'])  # Random color
-            self.state['color'] = new_value
+            new_value = rng.choice(light_states['color'])  # Random color
+            state['color'] = new_value
             func = 'setColor'  # func name for color adjustment
 
         # Ensure that 'func' is always set before returning the dictionary
@@ -74,5 +77,5 @@ class Light:
             'value': new_value,
             'func': func,  # 'turnOn', 'setBrightness', 'setColor', 'setMode', etc.
             'timestamp': current_time,  # Time when the action was generated
-            'state': self.state  # Current state after action
+            'state': dict(state)  # Copy of the state after action
         }
\ No newline at end of file
@@ -3,35 +3,38 @@
 import random
 from datetime import datetime
 
-class Speaker:
-    def __init__(self, device_id, user_id):
-        self.device_type = "Speaker"
-        self.device_id = device_id
-        self.user_id = user_id
-        self.state = {
-            'power': 'off',  # Power status
-            'volume': 50,    # Default volume (50%)
-            'mode': 'normal',  # Mode (normal, party, etc.)
-        }
+from fleet import FleetDevice
+
+# Speaker device class (a view over one row of a DeviceFleet)
+class Speaker(FleetDevice):
+    __slots__ = ()
+
+    device_type = "Speaker"
+    initial_state = {
+        'power': 'off',  # Power status
+        'volume': 50,    # Default volume (50%)
+        'mode': 'normal',  # Mode (normal, party, etc.)
+    }
 
-    def generate_action(self, current_time):
+    def generate_action(self, current_time, rng=random):
         # Choose an action (power, music, voice assistant)
-        action = random.choice(['power', 'voice assistant'])
+        action = rng.choice(['power', 'voice assistant'])
 
         func = None
         new_value = None
+        state = self.state
 
         if action == 'power':
             # Toggle the power state
-            if self.state['power'] == 'off':
+            if state['power'] == 'off':
                 new_value = 'on'
                 func = 'turnOn'
             else:
                 new_value = 'off'
                 func = 'turnOff'
-            self.state['power'] = new_value
+            state['power'] = new_value
         elif action == 'voice assistant':
-            new_value = random.choice(['weather', 'news', 'time', 'joke', 'reminder', 'music'])
+            new_value = rng.choice(['weather', 'news', 'time', 'joke', 'reminder', 'music'])
             func = f'get{new_value.capitalize()}'
 
         return {
@@ -42,7 +45,7 @@ class Speaker:
             'value': new_value,
             'func': func,
             'timestamp': current_time,
-            'state': self.state
+            'state': dict(state)
         }
 
 
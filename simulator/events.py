@@ -0,0 +1,71 @@
+# simulator/events.py
+
+import json
+from datetime import datetime
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
+
+
+class SimulationEvent(NamedTuple):
+    """Immutable snapshot of one device interaction"""
+    device_type: str
+    device_id: str
+    user_id: str
+    action: str
+    value: Any
+    func: str
+    timestamp: datetime
+    state: Mapping[str, Any]  # Read-only copy of the device state after the action
+
+    @classmethod
+    def from_interaction(cls, interaction):
+        """Build an event from a generate_action() dict, copying the state"""
+        return cls(
+            device_type=interaction['device_type'],
+            device_id=interaction['device_id'],
+            user_id=interaction['user_id'],
+            action=interaction['action'],
+            value=interaction['value'],
+            func=interaction['func'],
+            timestamp=interaction['timestamp'],
+            state=MappingProxyType(dict(interaction['state']))
+        )
+
+    def to_dict(self):
+        """Plain dict in the log format sent to the backend"""
+        log = self._asdict()
+        log['state'] = dict(self.state)
+        return log
+
+
+def batched(events, batch_size):
+    """
+    Group an event stream into lists of at most batch_size events
+    :param events: Iterable of events
+    :param batch_size: Maximum number of events per batch
+    :return: Generator of lists
+    """
+    iterator = iter(events)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_ndjson(events, f):
+    """
+    Write an event stream as NDJSON while it is being generated
+    :param events: Iterable of SimulationEvent
+    :param f: Text file object
+    :return: Number of events written
+    """
+    count = 0
+    for event in events:
+        log = event.to_dict()
+        log['timestamp'] = log['timestamp'].isoformat()
+        f.write(json.dumps(log, separators=(',', ':')))
+        f.write('\n')
+        count += 1
+    return count
@@ -0,0 +1,212 @@
+# simulator/fleet.py
+
+import re
+from collections.abc import MutableMapping
+
+import numpy as np
+
+# Enum vocabularies for the coded state columns (codes index into these lists)
+DEVICE_TYPES = ['Light', 'Speaker']
+POWER = ['off', 'on']
+MODES = ['normal', 'night', 'reading', 'party']
+COLORS = ['red', 'green', 'blue', 'yellow', 'white']
+
+# State keys exposed by each device type, in the order of the original state dicts
+STATE_KEYS = {
+    'Light': ('power', 'brightness', 'color', 'mode'),
+    'Speaker': ('power', 'volume', 'mode')
+}
+
+# Coded state columns: key -> vocabulary (None for plain 0-100 integers)
+_CODES = {'power': POWER, 'color': COLORS, 'mode': MODES, 'brightness': None, 'volume': None}
+_LOOKUP = {key: {name: code for code, name in enumerate(vocab)} for key, vocab in _CODES.items() if vocab}
+
+# Simulator IDs are 130 lowercase hex chars, stored packed as 65 bytes
+ID_HEX_LENGTH = 130
+ID_BYTES = ID_HEX_LENGTH // 2
+_PACKABLE_ID = re.compile(rf"[0-9a-f]{{{ID_HEX_LENGTH}}}")
+
+DEFAULT_CAPACITY = 1024
+
+
+class _IdTable:
+    """Growable table of IDs packed into fixed-width byte rows"""
+
+    def __init__(self, capacity):
+        self.packed = np.zeros((capacity, ID_BYTES), dtype=np.uint8)
+        self.size = 0
+        self._raw = {}  # row -> ID that is not 130 hex chars (kept as is)
+
+    def append(self, value):
+        row = self.size
+        if row == len(self.packed):
+            grown = np.zeros((max(1, 2 * row), ID_BYTES), dtype=np.uint8)
+            grown[:row] = self.packed
+            self.packed = grown
+        if _PACKABLE_ID.fullmatch(value):
+            self.packed[row] = np.frombuffer(bytes.fromhex(value), dtype=np.uint8)
+        else:
+            self._raw[row] = value
+        self.size += 1
+        return row
+
+    def get(self, row):
+        if row in self._raw:
+            return self._raw[row]
+        return self.packed[row].tobytes().hex()
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+
+class DeviceFleet:
+    """
+    Struct-of-arrays store for device identity and state. Device i is row i of
+    every column; enum states are uint8 codes into the vocabularies above.
+    """
+
+    COLUMNS = ('device_type', 'power', 'brightness', 'color', 'mode', 'volume')
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._size = 0
+        for name in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.uint8))
+        self.user_index = np.zeros(capacity, dtype=np.int32)
+        self._device_ids = _IdTable(capacity)
+        self._user_ids = _IdTable(max(1, capacity // 2))
+        self._user_lookup = {}  # user_id -> user row
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        capacity = max(1, 2 * len(self.power))
+        for name in self.COLUMNS + ('user_index',):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def add_device(self, device_type, device_id, user_id, state):
+        """
+        Append a device
+        :param device_type: 'Light' or 'Speaker'
+        :param device_id: Device ID
+        :param user_id: Owner user ID
+        :param state: Initial state dict
+        :return: Device index
+        """
+        index = self._size
+        if index == len(self.power):
+            self._grow()
+
+        user_row = self._user_lookup.get(user_id)
+        if user_row is None:
+            user_row = self._user_lookup[user_id] = self._user_ids.append(user_id)
+
+        self.device_type[index] = DEVICE_TYPES.index(device_type)
+        self.user_index[index] = user_row
+        self._device_ids.append(device_id)
+        self._size += 1
+        for key, value in state.items():
+            self.set(index, key, value)
+        return index
+
+    def device_id(self, index):
+        return self._device_ids.get(index)
+
+    def user_id(self, index):
+        return self._user_ids.get(self.user_index[index])
+
+    def get(self, index, key):
+        code = int(getattr(self, key)[index])
+        vocab = _CODES[key]
+        return vocab[code] if vocab else code
+
+    def set(self, index, key, value):
+        if key not in _CODES:
+            raise KeyError(key)
+        if _CODES[key]:
+            try:
+                code = _LOOKUP[key][value]
+            except KeyError:
+                raise ValueError(f"Invalid {key}: {value!r}")
+        else:
+            code = int(value)
+            if not 0 <= code <= 255:
+                raise ValueError(f"Invalid {key}: {value!r}")
+        getattr(self, key)[index] = code
+
+    def get_state(self, index):
+        """State of a device as a plain dict"""
+        return {key: self.get(index, key) for key in STATE_KEYS[DEVICE_TYPES[self.device_type[index]]]}
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column arrays and packed IDs"""
+        columns = sum(getattr(self, name).nbytes for name in self.COLUMNS) + self.user_index.nbytes
+        return columns + self._device_ids.nbytes + self._user_ids.nbytes
+
+
+class StateView(MutableMapping):
+    """Dict-like view of one device's state stored in a DeviceFleet"""
+
+    __slots__ = ('_fleet', '_index', '_keys')
+
+    def __init__(self, fleet, index, keys):
+        self._fleet = fleet
+        self._index = index
+        self._keys = keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return self._fleet.get(self._index, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._fleet.set(self._index, key, value)
+
+    def __delitem__(self, key):
+        raise TypeError("Device state keys cannot be removed")
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class FleetDevice:
+    """
+    Base for device classes that are thin views over a row of a DeviceFleet.
+    A device created without a fleet gets a private single-row fleet.
+    """
+
+    __slots__ = ('fleet', 'index')
+
+    device_type = None
+    initial_state = {}
+
+    def __init__(self, device_id, user_id, fleet=None):
+        if fleet is None:
+            fleet = DeviceFleet(capacity=1)
+        self.fleet = fleet
+        self.index = fleet.add_device(self.device_type, device_id, user_id, self.initial_state)
+
+    @property
+    def device_id(self):
+        return self.fleet.device_id(self.index)
+
+    @property
+    def user_id(self):
+        return self.fleet.user_id(self.index)
+
+    @property
+    def state(self):
+        return StateView(self.fleet, self.index, STATE_KEYS[self.device_type])
@@ -0,0 +1,126 @@
+# simulator/live.py
+
+import logging
+import time
+from collections import deque
+
+DEFAULT_REPORT_INTERVAL = 5.0
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+class RateMeter:
+    """Counts events and reports the overall and recent (sliding window) rate"""
+
+    def __init__(self, window_seconds=10.0, clock=time.monotonic):
+        self.clock = clock
+        self.window_seconds = window_seconds
+        self.started = clock()
+        self.total = 0
+        self._recent = deque()  # (time, count) inside the window
+
+    def add(self, count=1):
+        now = self.clock()
+        self.total += count
+        self._recent.append((now, count))
+        while self._recent and self._recent[0][0] < now - self.window_seconds:
+            self._recent.popleft()
+
+    @property
+    def elapsed(self):
+        return self.clock() - self.started
+
+    @property
+    def rate(self):
+        """Average events/sec since the meter was created"""
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def recent_rate(self):
+        """Events/sec over the last window_seconds"""
+        now = self.clock()
+        span = min(self.window_seconds, now - self.started)
+        count = sum(count for at, count in self._recent if at >= now - self.window_seconds)
+        return count / span if span > 0 else 0.0
+
+    def report(self):
+        return {
+            "total": self.total,
+            "elapsed_s": round(self.elapsed, 3),
+            "rate": round(self.rate, 1),
+            "recent_rate": round(self.recent_rate, 1)
+        }
+
+
+def paced(events, speed=1.0, max_wait=DEFAULT_FLUSH_INTERVAL, clock=time.monotonic, sleep=time.sleep):
+    """
+    Release events at wall-clock rate: simulated time advances speed times faster than real time
+    While waiting for the next event None is yielded every max_wait seconds so the consumer
+    can flush partial batches during quiet periods.
+    :param events: Iterable of SimulationEvent in timestamp order
+    :param speed: Simulated seconds per wall-clock second (1.0 = real time)
+    :param max_wait: Longest sleep before yielding a None heartbeat
+    :return: Generator of events (and None heartbeats)
+    """
+    origin = None
+    for event in events:
+        if origin is None:
+            origin = (event.timestamp, clock())
+        due = origin[1] + (event.timestamp - origin[0]).total_seconds() / speed
+        while True:
+            delay = due - clock()
+            if delay <= 0:
+                break
+            sleep(min(delay, max_wait))
+            if delay > max_wait:
+                yield None
+        yield event
+
+
+def run_live(events, send=None, speed=None, batch_size=1000, flush_interval=DEFAULT_FLUSH_INTERVAL,
+             report_interval=DEFAULT_REPORT_INTERVAL, clock=time.monotonic, sleep=time.sleep):
+    """
+    Drive a continuous event stream to the backend while measuring throughput
+    :param events: Iterable of SimulationEvent (e.g. SmartHomeSimulator.iter_events)
+    :param send: Callable taking a list of log dicts, truthy on success; None only measures generation
+    :param speed: None for max-throughput mode, otherwise the pacing factor (see paced)
+    :param batch_size: Maximum logs per send
+    :param flush_interval: Maximum seconds a partial batch waits before it is sent
+    :param report_interval: Seconds between rate reports in the log
+    :return: Dict with the generated/delivered rate reports and the failed count
+    """
+    generated = RateMeter(clock=clock)
+    delivered = RateMeter(clock=clock)
+    failed = 0
+
+    source = paced(events, speed, flush_interval, clock, sleep) if speed else events
+    batch = []
+    batch_started = clock()
+    next_report = batch_started + report_interval
+
+    def flush():
+        nonlocal failed
+        if batch and send is not None:
+            if send([event.to_dict() for event in batch]):
+                delivered.add(len(batch))
+            else:
+                failed += len(batch)
+        batch.clear()
+
+    for event in source:
+        if event is not None:
+            if not batch:
+                batch_started = clock()
+            generated.add()
+            batch.append(event)
+
+        now = clock()
+        if len(batch) >= batch_size or (batch and now - batch_started >= flush_interval):
+            flush()
+        if now >= next_report:
+            logging.info(f"Generated {generated.total} events ({generated.recent_rate:.1f}/s), "
+                         f"delivered {delivered.total} ({delivered.recent_rate:.1f}/s), failed {failed}")
+            next_report = now + report_interval
+    flush()
+
+    return {"generated": generated.report(), "delivered": delivered.report(), "failed": failed}
@@ -1,23 +1,34 @@
 # simulator/log_api_handler.py
 
-from datetime import datetime, timedelta
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import gzip
+import random
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 import logging
-import json
+
+from serialization import iter_ndjson_lines
 
 # Set backend API URL
-API_URL = "http://127.0.0.1:5000/simulate"
+STREAM_API_URL = "http://127.0.0.1:5000/simulate/stream"
+
+# Transport defaults: uncompressed NDJSON bytes per request, parallel requests, retry policy
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 60
+GZIP_LEVEL = 5
+# 500 is never retried: /simulate/stream commits batch by batch, so a 500 can follow rows that
+# are already stored and a replay would insert them again
+RETRY_STATUS_CODES = {429, 502, 503, 504}
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder for handling datetime objects"""
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()  # Convert datetime to ISO format string
-        return super().default(obj)
-
 def process_log_data(log_data):
     """
     Process log data to convert all datetime objects into serializable format
@@ -43,44 +54,241 @@ def process_log_data(log_data):
     
     return processed_logs
 
+def response_json(response):
+    """
+    Decode a JSON response body
+    :param response: requests.Response
+    :return: Parsed JSON object, or {} if the body is not JSON (e.g. an HTML page from a proxy)
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        logging.warning(f"Backend returned a non-JSON response ({response.headers.get('Content-Type')}); no ingest stats")
+        return {}
+    return body if isinstance(body, dict) else {}
+
+def request_not_sent(error):
+    """
+    Whether a requests exception happened before the request reached the backend
+    (connection refused, DNS failure, connect timeout), so it is safe to send again
+    :param error: requests.exceptions.RequestException
+    :return: bool
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+class LogTransport:
+    """
+    HTTP transport for shipping logs to the backend stream endpoint
+    Logs are encoded as NDJSON, split into chunks of at most chunk_bytes, gzip-compressed
+    and posted concurrently over a pooled requests.Session. Chunks are retried with exponential
+    backoff only when the backend cannot have stored them (connection not established,
+    429/502/503/504); only summary statistics are logged.
+    """
+
+    def __init__(self, url=STREAM_API_URL, chunk_bytes=DEFAULT_CHUNK_BYTES, concurrency=DEFAULT_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT,
+                 compresslevel=GZIP_LEVEL):
+        self.url = url
+        self.chunk_bytes = chunk_bytes
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.compresslevel = compresslevel
+
+        # One connection per concurrent request, reused across chunks
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='log-transport')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def iter_chunks(self, logs):
+        """
+        Encode logs as NDJSON chunks of at most chunk_bytes (a single larger log gets its own chunk)
+        :param logs: Iterable of log dicts
+        :return: Generator of (number of logs, NDJSON bytes)
+        """
+        lines = []
+        size = 0
+        for line in iter_ndjson_lines(logs):
+            if lines and size + len(line) > self.chunk_bytes:
+                yield len(lines), b''.join(lines)
+                lines, size = [], 0
+            lines.append(line)
+            size += len(line)
+        if lines:
+            yield len(lines), b''.join(lines)
+
+    def _post(self, body, headers):
+        """
+        POST with retries on connection errors before sending and retryable status codes
+        Read timeouts and dropped connections are not retried: the backend may already
+        have committed part of the body.
+        :return: Tuple of (response or None, retries used)
+        :raises requests.exceptions.RequestException: On errors that are not safe to retry
+        """
+        retries = 0
+        while True:
+            if hasattr(body, 'seek'):
+                body.seek(0)  # File bodies are streamed again on every attempt
+            try:
+                response = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response, retries
+                error = f"HTTP {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not request_not_sent(e):
+                    raise
+                response = None
+                error = str(e)
+
+            if retries >= self.max_retries:
+                logging.error(f"Giving up after {retries} retries: {error}")
+                return response, retries
+            # Exponential backoff with jitter so concurrent senders do not retry in lockstep
+            time.sleep(self.backoff * (2 ** retries) * (0.5 + random.random()))
+            retries += 1
+
+    def _send_chunk(self, count, body):
+        started = time.perf_counter()
+        compressed = gzip.compress(body, compresslevel=self.compresslevel)
+        headers = {"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"}
+        try:
+            response, retries = self._post(compressed, headers)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Backend communication error: {e}")
+            response, retries = None, 0
+
+        ingest = {}
+        ok = response is not None and response.status_code == 200
+        if response is not None:
+            # A failed stream ingest still reports the batches it committed before the error
+            ingest = response_json(response).get('ingest', {})
+        if not ok and response is not None:
+            logging.error(f"Failed to send chunk: {response.status_code} - {response.text[:200]}")
+        return {
+            "ok": ok,
+            "logs": count,
+            "accepted": ingest.get('accepted', 0),
+            "rejected": ingest.get('rejected', 0),
+            "retries": retries,
+            "bytes": len(body),
+            "gzip_bytes": len(compressed),
+            "elapsed_ms": (time.perf_counter() - started) * 1000
+        }
+
+    def send(self, logs):
+        """
+        Send logs in concurrent gzip chunks
+        :param logs: Iterable of log dicts
+        :return: Summary dict (chunks, failed_chunks, logs, accepted, rejected, retries, bytes, gzip_bytes, elapsed_ms)
+        """
+        started = time.perf_counter()
+        summary = {"chunks": 0, "failed_chunks": 0, "logs": 0, "accepted": 0, "rejected": 0,
+                   "retries": 0, "bytes": 0, "gzip_bytes": 0}
+
+        def collect(futures):
+            for future in futures:
+                result = future.result()
+                summary["chunks"] += 1
+                summary["failed_chunks"] += 0 if result["ok"] else 1
+                for key in ("logs", "accepted", "rejected", "retries", "bytes", "gzip_bytes"):
+                    summary[key] += result[key]
+
+        # Bound the chunks held in memory to a couple per sender thread
+        pending = set()
+        for count, body in self.iter_chunks(logs):
+            if len(pending) >= 2 * self.concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(self.executor.submit(self._send_chunk, count, body))
+        collect(wait(pending).done)
+
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logging.info(f"Sent {summary['logs']} logs in {summary['chunks']} chunks "
+                     f"({summary['gzip_bytes']} gzip bytes, {summary['retries']} retries, "
+                     f"{summary['failed_chunks']} failed) in {summary['elapsed_ms']} ms")
+        return summary
+
+    def send_file(self, path):
+        """
+        Stream an NDJSON log file (optionally gzip-compressed) as a single request, with retries
+        :param path: Path of the .ndjson or .ndjson.gz file
+        :return: Backend response or None if failed
+        """
+        headers = {"Content-Type": "application/x-ndjson"}
+        if path.endswith('.gz'):
+            headers["Content-Encoding"] = "gzip"
+        try:
+            with open(path, 'rb') as f:
+                response, _ = self._post(f, headers)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Backend communication error: {e}")
+            return None
+
+        if response is not None and response.status_code == 200:
+            body = response_json(response)
+            ingest = body.get('ingest', {})
+            logging.info(f"Sent {path}: {ingest.get('accepted')} accepted, {ingest.get('rejected')} rejected "
+                         f"in {ingest.get('elapsed_ms')} ms")
+            return body
+        if response is not None:
+            logging.error(f"Failed to send {path}: {response.status_code} - {response.text[:200]}")
+        return None
+
+_transport = None
+
+def get_transport():
+    """Shared LogTransport used by the module-level send functions"""
+    global _transport
+    if _transport is None:
+        _transport = LogTransport()
+    return _transport
+
 def send_log_to_backend(log_data):
     """
     Send log data to the backend
     :param log_data: Log data to be sent
-    :return: Backend response or None if failed
+    :return: Transport summary or None if any chunk failed
     """
-    try:
-        # Process datetime objects
-        processed_logs = process_log_data(log_data)
-        
-        # Print log data being sent
-        logging.info(f"Sending log data to backend: {json.dumps(processed_logs, indent=2, ensure_ascii=False)}")
-        
-        # Send logs via POST request
-        response = requests.post(API_URL, json={"logs": processed_logs})
-        
-        if response.status_code == 200:
-            logging.info("Logs successfully sent.")
-            return response.json()
-        else:
-            logging.error(f"Failed to send logs: {response.status_code} - {response.text}")
-            return None
-            
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Backend communication error: {e}")
+    summary = get_transport().send(log_data)
+    if summary["failed_chunks"]:
         return None
+    return summary
 
 def handle_log(logs):
     """
     Process and send log data to backend
     :param logs: List of logs to send
-    :return: None
+    :return: Backend response or None if failed
     """
     logging.info(f"Starting to send logs: {len(logs)} logs total")
     
     result = send_log_to_backend(logs)
     
-    if result:
-        logging.info(f"Response data: {result}")
-    else:
-        logging.error("Failed to send logs")
\ No newline at end of file
+    if not result:
+        logging.error("Failed to send logs")
+    return result
+
+def send_ndjson_file(path):
+    """
+    Stream an NDJSON log file (optionally gzip-compressed) to the backend stream endpoint
+    :param path: Path of the .ndjson or .ndjson.gz file
+    :return: Backend response or None if failed
+    """
+    return get_transport().send_file(path)
@@ -0,0 +1,168 @@
+# simulator/parallel.py
+
+import gzip
+import heapq
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import cycle, islice
+
+import numpy as np
+
+from simulator import SmartHomeSimulator
+from vectorized import VectorizedSimulator
+from serialization import encode_ndjson
+
+# Shard files are written once and read once; favour speed over ratio
+GZIP_LEVEL = 1
+# Events converted to dicts and encoded at a time when writing a shard file
+DEFAULT_WRITE_BATCH = 50000
+
+
+def build_homes(num_homes, layouts):
+    """
+    Expand the per-profile layouts into a list of homes, cycling through the profiles
+    :param num_homes: Number of homes to create
+    :param layouts: Dict of user profile -> list of device types
+    :return: List of (profile, device_types) tuples
+    """
+    return list(islice(cycle(layouts.items()), num_homes))
+
+
+def split_homes(homes, num_shards):
+    """Split homes into num_shards contiguous, nearly equal shards (empty shards are dropped)"""
+    bounds = np.linspace(0, len(homes), num_shards + 1).astype(int)
+    return [homes[begin:end] for begin, end in zip(bounds[:-1], bounds[1:]) if end > begin]
+
+
+def shard_path(output_dir, shard_index, compress=True):
+    return os.path.join(output_dir, f"shard-{shard_index:04d}.ndjson" + (".gz" if compress else ""))
+
+
+def _open_ndjson(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 'b', compresslevel=GZIP_LEVEL)
+    return open(path, mode + 'b')
+
+
+def run_shard(shard_index, homes, start_time, duration_hours, seed_sequence):
+    """
+    Simulate one shard of homes
+    The events are returned as NumPy arrays, which pickle back to the parent cheaply;
+    per-event dicts are only built by the NDJSON writer (see write_shard).
+    :param shard_index: Index of the shard
+    :param homes: List of (profile, device_types) tuples owned by this shard
+    :param start_time: Simulation start (datetime)
+    :param duration_hours: Simulated duration in hours
+    :param seed_sequence: np.random.SeedSequence for this shard
+    :return: Tuple of (result dict with the shard counters, ColumnarLogs in timestamp order)
+    """
+    started = time.perf_counter()
+
+    # User/device IDs and events are both derived from the shard's seed,
+    # so a shard is reproducible on its own
+    id_seed, event_seed = seed_sequence.generate_state(2)
+
+    simulator = SmartHomeSimulator(verbose=False, seed=int(id_seed))
+    for profile, device_types in homes:
+        user_id = simulator.add_user(profile)
+        for device_type in device_types:
+            simulator.add_device(device_type, user_id)
+    engine = VectorizedSimulator(simulator, seed=int(event_seed))
+    logs = engine.simulate(start_time, duration_hours)
+
+    result = {
+        "shard": shard_index,
+        "homes": len(homes),
+        "devices": len(simulator.devices),
+        "events": len(logs),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+    return result, logs
+
+
+def write_shard(logs, path, batch_events=DEFAULT_WRITE_BATCH):
+    """
+    Write a shard's events to an NDJSON file, converting to dicts one slice at a time
+    :param logs: ColumnarLogs in timestamp order
+    :param path: Output file path (.gz for gzip)
+    :param batch_events: Events converted and encoded per slice
+    :return: Number of events written
+    """
+    with _open_ndjson(path, 'w') as f:
+        for begin in range(0, len(logs), batch_events):
+            f.write(encode_ndjson(logs.slice(begin, begin + batch_events).to_logs()))
+    return len(logs)
+
+
+def run_sharded(homes, start_time, duration_hours, num_workers=None, num_shards=None, seed=None,
+                output_dir='simulation_output', compress=True, on_shard_done=None):
+    """
+    Partition homes across a process pool and simulate every shard independently
+    Workers return the events as arrays; the parent writes each shard's NDJSON file as it arrives.
+    The output is deterministic for a given seed and number of shards.
+    :param homes: List of (profile, device_types) tuples (see build_homes)
+    :param start_time: Simulation start (datetime)
+    :param duration_hours: Simulated duration in hours
+    :param num_workers: Worker processes (default: CPU count)
+    :param num_shards: Number of shards (default: num_workers)
+    :param seed: Root seed; every shard gets its own child seed
+    :param output_dir: Directory for the per-shard NDJSON files
+    :param compress: Write gzip-compressed NDJSON
+    :param on_shard_done: Optional callback called with each shard's file path as soon as it is written
+    :return: List of per-shard result dicts ordered by shard index
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    shards = split_homes(homes, num_shards or num_workers)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(shards))
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+
+    def shard_done(result, logs):
+        result["path"] = shard_path(output_dir, result['shard'], compress)
+        write_shard(logs, result["path"])
+        logging.info(f"Shard {result['shard']}: {result['events']} events from {result['devices']} devices "
+                     f"in {result['elapsed_ms']} ms")
+        if on_shard_done:
+            on_shard_done(result['path'])
+        results.append(result)
+
+    if num_workers == 1:
+        for index, shard in enumerate(shards):
+            shard_done(*run_shard(index, shard, start_time, duration_hours, seed_sequences[index]))
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(run_shard, index, shard, start_time, duration_hours, seed_sequences[index])
+                for index, shard in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                shard_done(*future.result())
+
+    return sorted(results, key=lambda result: result['shard'])
+
+
+def _read_events(path):
+    with _open_ndjson(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield datetime.fromisoformat(json.loads(line)['timestamp']), line
+
+
+def merge_shards(paths, output_path):
+    """
+    Merge timestamp-sorted shard files into a single timestamp-ordered NDJSON file
+    :param paths: Shard file paths
+    :param output_path: Merged file path (.gz for gzip)
+    :return: Number of events written
+    """
+    count = 0
+    with _open_ndjson(output_path, 'w') as out:
+        for _, line in heapq.merge(*(_read_events(path) for path in paths), key=lambda event: event[0]):
+            out.write(line)
+            count += 1
+    return count
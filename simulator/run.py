@@ -1,8 +1,7 @@
-import schedule
-import timeit
 import os
 import sys
-import random
+import argparse
+import asyncio
 from datetime import datetime
 import logging
 
@@ -11,104 +10,180 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
 # Import simulator and log handler
 from simulator import SmartHomeSimulator
-from log_api_handler import handle_log
+from log_api_handler import handle_log, send_ndjson_file
+from events import batched
+from live import run_live
+from async_shipper import AsyncLogShipper, ship_events
+from parallel import build_homes, run_sharded, merge_shards
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
-def run_simulation():
+# Devices installed for each user profile
+HOME_LAYOUTS = {
+    'Office Worker': ['Light', 'Speaker'],                                 # 9-5 traditional work schedule, basic setup
+    'Remote Worker': ['Light', 'Light', 'Speaker'],                        # Works from home, more devices
+    'Student': ['Light', 'Light', 'Speaker'],                              # Multiple lights for study areas
+    'Stay-at-home Parent': ['Light', 'Light', 'Speaker', 'Speaker'],       # Devices throughout the house
+    'Night Shift Worker': ['Light', 'Light', 'Speaker'],                   # Inverse schedule, emphasis on lighting
+    'Elderly Resident': ['Light', 'Light', 'Speaker'],                     # Regular schedule, multiple lights
+    'Freelancer': ['Light', 'Speaker'],                                    # Flexible schedule
+    'Weekend Traveler': ['Light', 'Speaker'],                              # Regular weekday, traveling weekends
+    'Family with Kids': ['Light', 'Light', 'Light', 'Speaker', 'Speaker'], # Complex schedule with multiple routines
+    'Fitness Enthusiast': ['Light', 'Speaker']                             # Early morning/evening activity peaks
+}
+
+def parse_arguments():
+    """
+    Parse command line arguments.
+    
+    Returns:
+        argparse.Namespace: Parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser(description='Run the smart home simulation and send the logs to the backend')
+    parser.add_argument('--hours', type=int, default=168,
+                      help='Simulated duration in hours (default: 168)')
+    parser.add_argument('--scheduler', choices=['tick', 'event'], default='tick',
+                      help="'tick' polls every device every 1-5 minutes, 'event' follows each profile's active hours")
+    parser.add_argument('--stream', action='store_true',
+                      help='Send logs in batches while the simulation runs instead of at the end')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                      help='Logs per request in streaming mode (default: 1000)')
+    parser.add_argument('--live', choices=['paced', 'max'], default=None,
+                      help="Continuous mode: 'paced' sends at --speed x wall-clock rate, 'max' as fast as possible")
+    parser.add_argument('--speed', type=float, default=1.0,
+                      help='Simulated seconds per wall-clock second in paced mode (default: 1.0)')
+    parser.add_argument('--dry-run', action='store_true',
+                      help='Live modes only measure the generation rate without sending')
+    parser.add_argument('--in-flight', type=int, default=None,
+                      help='Live modes: ship through the async shipper with this many concurrent requests')
+    parser.add_argument('--max-queue', type=int, default=10000,
+                      help='Async shipper queue size; a full queue slows the simulator down (default: 10000)')
+    parser.add_argument('--homes', type=int, default=None,
+                      help='Number of simulated homes; enables the sharded parallel mode')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                      help='Worker processes for the parallel mode (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=None,
+                      help='Seed for reproducible runs (parallel shards get derived seeds)')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None,
+                      help='Simulation start as ISO timestamp (default: now)')
+    parser.add_argument('--checkpoint', type=str, default=None,
+                      help='Checkpoint file written while streaming (implies --stream)')
+    parser.add_argument('--resume', type=str, default=None,
+                      help='Resume the run saved in this checkpoint file (implies --stream)')
+    parser.add_argument('--output-dir', type=str, default='simulation_output',
+                      help='Directory for the per-shard NDJSON files in parallel mode')
+    parser.add_argument('--merge', action='store_true',
+                      help='Merge the shard files into one timestamp-ordered file')
+    parser.add_argument('--send', action='store_true',
+                      help='Stream each shard file to the backend as soon as it is written')
+    args = parser.parse_args()
+    # Shards run on the vectorized engine, which only implements the tick scheduler
+    if args.homes and args.scheduler != 'tick':
+        parser.error(f"--scheduler {args.scheduler} is not supported with --homes (the parallel mode is tick-only)")
+    return args
+
+def build_simulator(seed=None):
     # Initialize simulator
     logging.info("Initializing Smart Home Simulator...")
-    simulator = SmartHomeSimulator()
-
-    # Define diverse user profiles
-    user_profiles = [
-        'Office Worker',          # 9-5 traditional work schedule
-        'Remote Worker',          # Works from home
-        'Student',               # College/University student
-        'Stay-at-home Parent',   # At home during day with different schedule
-        'Night Shift Worker',    # Inverse schedule
-        'Elderly Resident',      # More time at home, regular schedule
-        'Freelancer',           # Flexible schedule
-        'Weekend Traveler',     # Regular weekday, traveling weekends
-        'Family with Kids',     # Complex schedule with multiple routines
-        'Fitness Enthusiast'    # Early morning/evening activity peaks
-    ]
-
-    # Add users
-    logging.info("Adding users...")
-    user_ids = {}
-    for profile in user_profiles:
-        user_ids[profile] = simulator.add_user(profile)
+    simulator = SmartHomeSimulator(seed=seed)
+
+    # Add users and their devices based on their profile
+    logging.info("Adding users and devices for each user profile...")
+    for profile, device_types in HOME_LAYOUTS.items():
+        user_id = simulator.add_user(profile)
         logging.info(f"Added user: {profile}")
+        for device_type in device_types:
+            simulator.add_device(device_type, user_id)
+    return simulator
 
-    # Available device types
-    device_types = ['Light', 'Speaker']
+def stream_events(simulator, events, batch_size=1000, checkpoint=None):
+    # Events are sent as they are generated; nothing accumulates in memory.
+    # The checkpoint is rewritten after every delivered batch, so a resume never re-sends
+    # rows the backend already ingested (only a crash between delivery and the write can)
+    if checkpoint:
+        simulator.save_checkpoint(checkpoint)
+    for number, batch in enumerate(batched(events, batch_size), start=1):
+        result = handle_log([event.to_dict() for event in batch])
+        if checkpoint:
+            # Never checkpoint past a batch the backend did not accept
+            if not result:
+                raise RuntimeError(f"Batch {number} was not delivered; resume from {checkpoint}")
+            simulator.save_checkpoint(checkpoint)
+    logging.info("Simulation completed.")
 
-    # Add devices for each user based on their profile
-    logging.info("Adding devices for each user profile...")
-    
-    # Office Worker - basic setup
-    simulator.add_device('Light', user_ids['Office Worker'])
-    simulator.add_device('Speaker', user_ids['Office Worker'])
-    
-    # Remote Worker - more devices since always at home
-    simulator.add_device('Light', user_ids['Remote Worker'])
-    simulator.add_device('Light', user_ids['Remote Worker'])
-    simulator.add_device('Speaker', user_ids['Remote Worker'])
-    
-    # Student - multiple lights for study areas
-    simulator.add_device('Light', user_ids['Student'])
-    simulator.add_device('Light', user_ids['Student'])
-    simulator.add_device('Speaker', user_ids['Student'])
-    
-    # Stay-at-home Parent - multiple devices throughout house
-    simulator.add_device('Light', user_ids['Stay-at-home Parent'])
-    simulator.add_device('Light', user_ids['Stay-at-home Parent'])
-    simulator.add_device('Speaker', user_ids['Stay-at-home Parent'])
-    simulator.add_device('Speaker', user_ids['Stay-at-home Parent'])
-    
-    # Night Shift Worker - emphasis on lighting
-    simulator.add_device('Light', user_ids['Night Shift Worker'])
-    simulator.add_device('Light', user_ids['Night Shift Worker'])
-    simulator.add_device('Speaker', user_ids['Night Shift Worker'])
-    
-    # Elderly Resident - simple setup with multiple lights
-    simulator.add_device('Light', user_ids['Elderly Resident'])
-    simulator.add_device('Light', user_ids['Elderly Resident'])
-    simulator.add_device('Speaker', user_ids['Elderly Resident'])
-    
-    # Freelancer - flexible setup
-    simulator.add_device('Light', user_ids['Freelancer'])
-    simulator.add_device('Speaker', user_ids['Freelancer'])
-    
-    # Weekend Traveler - basic setup
-    simulator.add_device('Light', user_ids['Weekend Traveler'])
-    simulator.add_device('Speaker', user_ids['Weekend Traveler'])
-    
-    # Family with Kids - multiple devices throughout
-    simulator.add_device('Light', user_ids['Family with Kids'])
-    simulator.add_device('Light', user_ids['Family with Kids'])
-    simulator.add_device('Light', user_ids['Family with Kids'])
-    simulator.add_device('Speaker', user_ids['Family with Kids'])
-    simulator.add_device('Speaker', user_ids['Family with Kids'])
-    
-    # Fitness Enthusiast - basic setup
-    simulator.add_device('Light', user_ids['Fitness Enthusiast'])
-    simulator.add_device('Speaker', user_ids['Fitness Enthusiast'])
+def run_simulation(duration_hours=168, stream=False, batch_size=1000, scheduler='tick', seed=None,
+                   start_time=None, checkpoint=None):
+    simulator = build_simulator(seed)
 
     # Run simulation
-    start_time = datetime.now()
+    start_time = start_time or datetime.now()
     logging.info(f"Starting simulation at: {start_time}")
-    simulator.simulate(start_time, duration_hours=168)
+    if stream or checkpoint:
+        events = simulator.iter_events(start_time, duration_hours=duration_hours, scheduler=scheduler)
+        stream_events(simulator, events, batch_size, checkpoint)
+        return
+
+    simulator.simulate(start_time, duration_hours=duration_hours, scheduler=scheduler)
 
     # Send logs to backend
     logging.info("Simulation completed. Sending logs to backend...")
     handle_log(simulator.logs)
 
+def resume_simulation(path, batch_size=1000):
+    simulator = SmartHomeSimulator.load_checkpoint(path)
+    logging.info(f"Resuming simulation from {path} at: {simulator.scheduler.clock}")
+    stream_events(simulator, simulator.resume_events(), batch_size, path)
+
+def run_live_simulation(args):
+    simulator = build_simulator(args.seed)
+    start_time = args.start or datetime.now()
+    speed = args.speed if args.live == 'paced' else None
+    logging.info(f"Starting {args.live} live simulation at: {start_time}" + (f" ({speed}x)" if speed else ""))
+
+    events = simulator.iter_events(start_time, duration_hours=args.hours, scheduler=args.scheduler)
+    if args.in_flight and not args.dry_run:
+        # Concurrent sends with backpressure on the simulator
+        shipper = AsyncLogShipper(max_queue=args.max_queue, batch_size=args.batch_size, max_in_flight=args.in_flight)
+        asyncio.run(ship_events(events, shipper, speed=speed))
+        return
+    summary = run_live(events, send=None if args.dry_run else handle_log, speed=speed, batch_size=args.batch_size)
+    logging.info(f"Live simulation finished: {summary}")
+
+def run_parallel_simulation(args):
+    homes = build_homes(args.homes, HOME_LAYOUTS)
+    start_time = args.start or datetime.now()
+    logging.info(f"Simulating {len(homes)} homes for {args.hours} hours on {args.workers} workers...")
+
+    shards = run_sharded(
+        homes,
+        start_time,
+        args.hours,
+        num_workers=args.workers,
+        seed=args.seed,
+        output_dir=args.output_dir,
+        on_shard_done=send_ndjson_file if args.send else None
+    )
+    total = sum(shard['events'] for shard in shards)
+    logging.info(f"Generated {total} events in {len(shards)} shards")
+
+    if args.merge:
+        merged_path = os.path.join(args.output_dir, 'merged.ndjson.gz')
+        merge_shards([shard['path'] for shard in shards], merged_path)
+        logging.info(f"Merged shards into {merged_path}")
+
 if __name__ == "__main__":
     try:
-        run_simulation()
+        args = parse_arguments()
+        if args.resume:
+            resume_simulation(args.resume, batch_size=args.batch_size)
+        elif args.live:
+            run_live_simulation(args)
+        elif args.homes:
+            run_parallel_simulation(args)
+        else:
+            run_simulation(args.hours, stream=args.stream, batch_size=args.batch_size, scheduler=args.scheduler,
+                           seed=args.seed, start_time=args.start, checkpoint=args.checkpoint)
         logging.info("Simulation and log transmission completed successfully")
     except Exception as e:
         logging.error(f"Error during simulation: {str(e)}")
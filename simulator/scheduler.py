@@ -0,0 +1,167 @@
+# simulator/scheduler.py
+
+import heapq
+import random
+from datetime import timedelta
+
+from events import SimulationEvent
+from utils.user_pattern import user_patterns
+
+# Mean tick length of the polling simulation (ticks are 1-5 minutes apart)
+MEAN_TICK_MINUTES = 3.0
+
+# How far ahead to look for the next active window before giving up
+MAX_LOOKAHEAD_DAYS = 8
+
+
+def is_active_hour(pattern, hour):
+    return any(start <= hour < end for start, end in pattern['active_hours'])
+
+
+def interaction_probability(pattern, time):
+    """Per-tick interaction probability for the weekday/weekend of the given time"""
+    is_weekday = time.weekday() < 5
+    return pattern['interaction_probability']['weekday' if is_weekday else 'weekend']
+
+
+def next_active_window(pattern, time):
+    """
+    Find the active window containing time, or the next one after it
+    :param pattern: Entry of user_patterns
+    :param time: datetime
+    :return: Tuple of (window start, window end, interaction probability) or None
+    """
+    day = time.replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(MAX_LOOKAHEAD_DAYS):
+        probability = interaction_probability(pattern, day)
+        for start_hour, end_hour in sorted(pattern['active_hours']):
+            end = day + timedelta(hours=end_hour)
+            if end > time and probability > 0:
+                return day + timedelta(hours=start_hour), end, probability
+        day += timedelta(days=1)
+    return None
+
+
+def next_interaction_time(pattern, after, rng=random, window=None):
+    """
+    Sample the next interaction of a device after the given time
+    Within an active window interactions form a Poisson process with the same mean rate
+    as polling every MEAN_TICK_MINUTES and interacting with the profile's probability.
+    Outside the active windows the clock jumps straight to the next window.
+    :param pattern: Entry of user_patterns
+    :param after: datetime of the previous interaction (or the simulation start)
+    :param rng: Random number generator (random module or random.Random)
+    :param window: Window returned by the previous call, reused while it has not ended
+    :return: Tuple of (datetime of the next interaction or None if the profile is never active, window)
+    """
+    time = after
+    while True:
+        if window is None or time >= window[1]:
+            window = next_active_window(pattern, time)
+            if window is None:
+                return None, None
+        start, end, probability = window
+        time = max(time, start)
+        time += timedelta(minutes=rng.expovariate(probability / MEAN_TICK_MINUTES))
+        if time < end:
+            return time, window
+        # Exponential gaps are memoryless: continue sampling from the end of the window
+        time = end
+
+
+class TickScheduler:
+    """
+    Polling driver for SmartHomeSimulator: every device acts on every tick and the
+    clock advances 1-5 minutes per tick. The position inside the current tick is
+    kept on the instance so the run can be checkpointed between any two events.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.clock = None
+        self.end_time = None
+        self.position = 0  # Index of the next device to act in the current tick
+
+    def start(self, start_time, duration_hours):
+        self.clock = start_time
+        self.end_time = start_time + timedelta(hours=duration_hours)
+        self.position = 0
+
+    def run(self):
+        """
+        Continue the simulation from the current position
+        :return: Generator of SimulationEvent in timestamp order
+        """
+        rng = self.simulator.rng
+        devices = list(self.simulator.devices.values())
+
+        # Run the simulation for the given duration
+        while self.clock < self.end_time:
+            while self.position < len(devices):
+                device = devices[self.position]
+                self.position += 1
+                # Generate actions for each device based on the current time
+                interaction = device.generate_action(self.clock, rng)
+                if interaction:
+                    yield SimulationEvent.from_interaction(interaction)
+            # Move forward in time by a random amount (1 to 5 minutes)
+            self.position = 0
+            self.clock += timedelta(minutes=rng.randint(1, 5))
+
+
+class EventScheduler:
+    """
+    Discrete-event driver for SmartHomeSimulator: a heap holds each device's next
+    interaction time, so idle hours cost nothing and the work is proportional to the
+    number of events instead of devices x ticks.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.end_time = None
+        self.heap = []     # (next interaction time, device index); the index breaks ties deterministically
+        self.windows = []  # Current active window of every device
+
+    @property
+    def clock(self):
+        return self.heap[0][0] if self.heap else self.end_time
+
+    def start(self, start_time, duration_hours):
+        rng = self.simulator.rng
+        self.end_time = start_time + timedelta(hours=duration_hours)
+        self.heap = []
+        self.windows = []
+        for index, pattern in enumerate(self._patterns()):
+            time, window = next_interaction_time(pattern, start_time, rng)
+            self.windows.append(window)
+            if time is not None and time < self.end_time:
+                self.heap.append((time, index))
+        heapq.heapify(self.heap)
+
+    def _patterns(self):
+        simulator = self.simulator
+        return [user_patterns[simulator.users[device.user_id]] for device in simulator.devices.values()]
+
+    def run(self):
+        """
+        Continue the simulation from the current heap
+        :return: Generator of SimulationEvent in timestamp order
+        """
+        rng = self.simulator.rng
+        devices = list(self.simulator.devices.values())
+        patterns = self._patterns()
+        heap, windows = self.heap, self.windows
+
+        while heap:
+            time, index = heap[0]
+            interaction = devices[index].generate_action(time, rng)
+
+            # Schedule the device's next interaction before yielding so the state is complete
+            next_time, windows[index] = next_interaction_time(patterns[index], time, rng, windows[index])
+            if next_time is not None and next_time < self.end_time:
+                heapq.heapreplace(heap, (next_time, index))
+            else:
+                heapq.heappop(heap)
+
+            if interaction:
+                yield SimulationEvent.from_interaction(interaction)
@@ -0,0 +1,156 @@
+# simulator/serialization.py
+"""
+Encoders for simulation logs. Logs are encoded straight to bytes in one pass; orjson
+(datetime-aware, written in Rust) is used when installed, otherwise the stdlib encoder
+with DateTimeEncoder. msgpack and Parquet (pyarrow) exports are optional.
+"""
+
+import json
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Flat state columns of the Parquet export (same as the backend's typed state columns)
+STATE_FIELDS = ('power', 'brightness', 'color', 'mode', 'volume')
+
+
+class DateTimeEncoder(json.JSONEncoder):
+    """Custom JSON encoder for handling datetime objects"""
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()  # Convert datetime to ISO format string
+        return super().default(obj)
+
+
+_json_encoder = DateTimeEncoder(separators=(',', ':'), ensure_ascii=False)
+
+
+def _default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def iter_ndjson_lines(logs):
+    """
+    Encode logs one by one as newline-terminated JSON bytes
+    :param logs: Iterable of log dicts (datetimes are written in ISO format)
+    :return: Generator of bytes
+    """
+    if orjson is not None:
+        dumps, option = orjson.dumps, orjson.OPT_APPEND_NEWLINE
+        for log in logs:
+            yield dumps(log, option=option)
+    else:
+        encode = _json_encoder.encode
+        for log in logs:
+            yield (encode(log) + '\n').encode('utf-8')
+
+
+def encode_ndjson(logs):
+    """
+    Encode logs as an NDJSON document
+    :param logs: Iterable of log dicts
+    :return: bytes
+    """
+    return b''.join(iter_ndjson_lines(logs))
+
+
+def encode_json(payload):
+    """
+    Encode a JSON document such as {"logs": [...]} for the /simulate endpoint
+    :param payload: JSON-compatible object, datetimes allowed
+    :return: bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return _json_encoder.encode(payload).encode('utf-8')
+
+
+def encode_msgpack(logs):
+    """
+    Encode logs as a msgpack array (requires the msgpack package)
+    :param logs: Iterable of log dicts
+    :return: bytes
+    """
+    if msgpack is None:
+        raise ImportError("msgpack is not installed")
+    return msgpack.packb(list(logs), default=_default, use_bin_type=True)
+
+
+def _columnar_table(logs):
+    """Arrow table straight from the arrays of a ColumnarLogs (no per-event Python objects)"""
+    from vectorized import DEVICE_TYPES, ACTIONS, FUNCS, VALUES, POWER, MODES, COLORS
+
+    def dictionary(codes, vocabulary):
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(vocabulary))
+
+    device = logs.device_index
+    is_light = logs.device_types[device] == DEVICE_TYPES.index('Light')
+    return pa.table({
+        'device_type': dictionary(logs.device_types[device], DEVICE_TYPES),
+        'device_id': dictionary(device, list(logs.device_ids)),
+        'user_id': pa.array(logs.user_ids[device].tolist(), type=pa.string()),
+        'action': dictionary(logs.action, ACTIONS),
+        'value': dictionary(logs.value, [str(value) for value in VALUES]),
+        'func': dictionary(logs.func, FUNCS),
+        'timestamp': pa.array(logs.timestamp.astype('datetime64[us]'), type=pa.timestamp('us')),
+        'power': dictionary(logs.power, POWER),
+        'brightness': pa.array(logs.brightness, mask=~is_light, type=pa.uint8()),
+        'color': pa.DictionaryArray.from_arrays(
+            pa.array(logs.color, mask=~is_light, type=pa.int32()), pa.array(COLORS)),
+        'mode': dictionary(logs.mode, MODES),
+        'volume': pa.array(logs.volume, mask=is_light, type=pa.uint8())
+    })
+
+
+def _rows_table(logs):
+    columns = {name: [] for name in ('device_type', 'device_id', 'user_id', 'action', 'value', 'func', 'timestamp') + STATE_FIELDS}
+    for log in logs:
+        state = log.get('state') or {}
+        for name in ('device_type', 'device_id', 'user_id', 'action', 'func', 'timestamp'):
+            columns[name].append(log[name])
+        columns['value'].append(None if log['value'] is None else str(log['value']))
+        for name in STATE_FIELDS:
+            columns[name].append(state.get(name))
+    schema = pa.schema([
+        ('device_type', pa.string()), ('device_id', pa.string()), ('user_id', pa.string()),
+        ('action', pa.string()), ('value', pa.string()), ('func', pa.string()),
+        ('timestamp', pa.timestamp('us')), ('power', pa.string()), ('brightness', pa.uint8()),
+        ('color', pa.string()), ('mode', pa.string()), ('volume', pa.uint8())
+    ])
+    return pa.table(columns, schema=schema)
+
+
+def write_parquet(logs, path, compression='zstd'):
+    """
+    Export logs as a Parquet file with the state flattened into columns (requires pyarrow)
+    :param logs: ColumnarLogs from the vectorized engine (converted without per-event objects)
+                 or an iterable of log dicts
+    :param path: Output file path
+    :param compression: Parquet compression codec
+    :return: Number of rows written
+    """
+    if pa is None:
+        raise ImportError("pyarrow is not installed")
+    if hasattr(logs, 'device_index'):
+        table = _columnar_table(logs)
+    else:
+        table = _rows_table(logs)
+    pq.write_table(table, path, compression=compression)
+    return table.num_rows
@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta
+import hashlib
+import pickle
 import random
 import sys
 import os
@@ -7,56 +8,129 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
 from devices.light import Light
 from devices.speaker import Speaker
+from fleet import DeviceFleet
 from utils.user_pattern import user_patterns
+from vectorized import VectorizedSimulator
+from scheduler import TickScheduler, EventScheduler, is_active_hour, interaction_probability
+
+SCHEDULERS = {'tick': TickScheduler, 'event': EventScheduler}
 
 # SmartHomeSimulator class that handles the simulation logic
 class SmartHomeSimulator:
-    def __init__(self):
-        self.devices = {}  # device_id : device_instance mapping
+    def __init__(self, verbose=True, seed=None):
+        self.fleet = DeviceFleet()  # Array-backed state of every device
+        self.devices = {}  # device_id : device_instance mapping (views over self.fleet)
         self.users = {}    # user_id : user_type mapping
         self.logs = []  # List of simulation logs
+        self.verbose = verbose  # Print every added user
+        # With a seed, IDs are derived from (seed, user/device number) and every draw comes
+        # from a private generator, so runs are reproducible; without one the global random module is used
+        self.seed = seed
+        self.rng = random if seed is None else random.Random(seed)
+        self.scheduler = None  # Driver of the current run (kept for checkpoints)
+
+    def _new_id(self, kind, number):
+        if self.seed is None:
+            return ''.join(self.rng.choices('0123456789abcdef', k=130))
+        return hashlib.shake_256(f"{self.seed}:{kind}:{number}".encode()).hexdigest(65)
 
     def add_user(self, user_type):
-        user_id = ''.join(random.choices('0123456789abcdef', k=130))
+        user_id = self._new_id('user', len(self.users))
         self.users[user_id] = user_type
-        print(f"User added: {user_id} ({user_type})")
+        if self.verbose:
+            print(f"User added: {user_id} ({user_type})")
         return user_id
     
     def add_device(self, device_type, user_id):
-        device_id = ''.join(random.choices('0123456789abcdef', k=130))
+        device_id = self._new_id('device', len(self.devices))
         if device_type == 'Light':
-            self.devices[device_id] = Light(device_id, user_id)  # Add a light device
+            self.devices[device_id] = Light(device_id, user_id, self.fleet)  # Add a light device
         elif device_type == 'Speaker':
-            self.devices[device_id] = Speaker(device_id, user_id)
+            self.devices[device_id] = Speaker(device_id, user_id, self.fleet)
 
-    def simulate(self, start_time, duration_hours):
-        current_time = start_time
-        end_time = start_time + timedelta(hours=duration_hours)
-        
-        # Run the simulation for the given duration
-        while current_time < end_time:
-            for device in self.devices.values():
-                # Generate actions for each device based on the current time
-                interaction = device.generate_action(current_time)
-                # 로그를 찍어서 interaction이 제대로 생성되었는지 확인
-                if interaction:
-                    print(f"Generated interaction: {interaction}")
-                    self.logs.append(interaction)
-                else:
-                    print("No interaction generated.")
-            # Move forward in time by a random amount (1 to 5 minutes)
-            current_time += timedelta(minutes=random.randint(1, 5))
+    def iter_events(self, start_time, duration_hours, scheduler='tick'):
+        """
+        Run the simulation lazily, yielding each interaction as soon as it is generated
+        :param start_time: Simulation start (datetime)
+        :param duration_hours: Simulated duration in hours
+        :param scheduler: 'tick' polls every device every 1-5 minutes; 'event' only
+                          schedules interactions inside each profile's active hours (see EventScheduler)
+        :return: Generator of immutable SimulationEvent snapshots in timestamp order
+        """
+        if scheduler not in SCHEDULERS:
+            raise ValueError(f"Unknown scheduler: {scheduler}")
+        self.scheduler = SCHEDULERS[scheduler](self)
+        self.scheduler.start(start_time, duration_hours)
+        return self.scheduler.run()
+
+    def resume_events(self):
+        """
+        Continue the run restored by load_checkpoint()
+        :return: Generator of the events after the checkpoint
+        """
+        if self.scheduler is None:
+            raise RuntimeError("No simulation run to resume")
+        return self.scheduler.run()
+
+    def save_checkpoint(self, path):
+        """
+        Write device states, RNG state and the scheduler clock to a file
+        Call it between events (e.g. after a batch has been delivered); the file is
+        replaced atomically so a crash never leaves a truncated checkpoint.
+        :param path: Checkpoint file path
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """
+        Restore a simulator saved with save_checkpoint()
+        :param path: Checkpoint file path
+        :return: SmartHomeSimulator ready for resume_events()
+        """
+        with open(path, 'rb') as f:
+            simulator = pickle.load(f)
+        if not isinstance(simulator, cls):
+            raise ValueError(f"{path} is not a simulator checkpoint")
+        return simulator
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The random module itself cannot be pickled, only its state; logs are not checkpointed
+        state['rng'] = self.rng.getstate()
+        state['logs'] = []
+        return state
+
+    def __setstate__(self, state):
+        rng_state = state.pop('rng')
+        self.__dict__.update(state)
+        self.rng = random.Random()
+        self.rng.setstate(rng_state)
+
+    def simulate(self, start_time, duration_hours, scheduler='tick'):
+        # Collect every interaction into self.logs
+        for event in self.iter_events(start_time, duration_hours, scheduler):
+            interaction = event.to_dict()
+            # 로그를 찍어서 interaction이 제대로 생성되었는지 확인
+            print(f"Generated interaction: {interaction}")
+            self.logs.append(interaction)
+
+    def simulate_vectorized(self, start_time, duration_hours, seed=None):
+        """
+        Same simulation as simulate(), computed with NumPy for all devices at once
+        :param start_time: Simulation start (datetime)
+        :param duration_hours: Simulated duration in hours
+        :param seed: Optional seed for the NumPy random generator
+        :return: ColumnarLogs (call .to_logs() for the list-of-dicts format)
+        """
+        return VectorizedSimulator(self, seed).simulate(start_time, duration_hours)
 
     def _should_interact(self, time, user_type):
         pattern = user_patterns[user_type]
         
-        # 활성 시간대 체크
-        is_active_hour = any(start <= time.hour < end 
-                           for start, end in pattern['active_hours'])
-        
-        # 요일별 확률 적용
-        is_weekday = time.weekday() < 5
-        prob = pattern['interaction_probability']['weekday' if is_weekday else 'weekend']
-        
-        return is_active_hour and random.random() < prob
+        # 활성 시간대 체크 후 요일별 확률 적용
+        return is_active_hour(pattern, time.hour) and self.rng.random() < interaction_probability(pattern, time)
 
@@ -63,5 +63,252 @@ def test_simulator():
         logging.info("-" * 50)  # Separating logs for readability
 
 
+
+
+# 벡터화 엔진과 기존 객체 기반 시뮬레이션의 action/func 분포 비교
+def test_vectorized_parity(duration_hours=72, seed=0, z=4.0):
+    from collections import Counter
+    import contextlib
+    import io
+    import math
+
+    # 두 엔진 모두 seed를 고정해 실행마다 같은 결과 (CI에서 결정적으로 통과/실패)
+    def build_simulator():
+        simulator = SmartHomeSimulator(seed=seed)
+        for profile in ['Office Worker', 'Remote Worker', 'Student']:
+            user_id = simulator.add_user(profile)
+            simulator.add_device('Light', user_id)
+            simulator.add_device('Light', user_id)
+            simulator.add_device('Speaker', user_id)
+        return simulator
+
+    start_time = datetime(2024, 1, 1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        object_simulator = build_simulator()
+        object_simulator.simulate(start_time, duration_hours=duration_hours)
+        vectorized_logs = build_simulator().simulate_vectorized(start_time, duration_hours=duration_hours, seed=seed)
+
+    object_counts = Counter((log['device_type'], log['action'], log['func']) for log in object_simulator.logs)
+    vectorized_counts = vectorized_logs.counts()
+
+    # 디바이스 종류별 비율로 비교 (tick 수는 랜덤이므로 절대 개수는 다름)
+    for device_type in ['Light', 'Speaker']:
+        object_total = sum(c for k, c in object_counts.items() if k[0] == device_type)
+        vectorized_total = sum(c for k, c in vectorized_counts.items() if k[0] == device_type)
+        for key in sorted(set(object_counts) | set(vectorized_counts)):
+            if key[0] != device_type:
+                continue
+            object_share = object_counts.get(key, 0) / object_total
+            vectorized_share = vectorized_counts.get(key, 0) / vectorized_total
+            # 허용 오차: 두 비율 차이의 binomial 표준오차의 z배 (표본 크기에 맞춰 조정)
+            pooled = (object_counts.get(key, 0) + vectorized_counts.get(key, 0)) / (object_total + vectorized_total)
+            tolerance = z * math.sqrt(pooled * (1 - pooled) * (1 / object_total + 1 / vectorized_total))
+            logging.info(f"{key}: object={object_share:.3f} vectorized={vectorized_share:.3f} tolerance={tolerance:.3f}")
+            assert abs(object_share - vectorized_share) <= tolerance, f"Distribution mismatch for {key}"
+
+    # 컬럼 결과가 기존 로그 형식으로 변환되는지 확인
+    log = vectorized_logs.to_logs()[0]
+    assert set(log) == set(object_simulator.logs[0])
+    logging.info("Vectorized engine matches the object-based action/func distribution")
+
+
+# 이벤트 스케줄러가 user_patterns 기반 tick 시뮬레이션과 같은 빈도로 상호작용하는지 확인
+def test_event_scheduler(duration_hours=24 * 14, tolerance=0.05):
+    from datetime import timedelta
+    from utils.user_pattern import user_patterns
+
+    simulator = SmartHomeSimulator(verbose=False)
+    for profile in user_patterns:
+        user_id = simulator.add_user(profile)
+        simulator.add_device('Light', user_id)
+        simulator.add_device('Speaker', user_id)
+
+    start_time = datetime(2024, 1, 1)
+    events = list(simulator.iter_events(start_time, duration_hours, scheduler='event'))
+
+    # 모든 이벤트가 시간 순서이고 활성 시간대 안에 있어야 함
+    assert all(a.timestamp <= b.timestamp for a, b in zip(events, events[1:]))
+    for event in events:
+        pattern = user_patterns[simulator.users[event.user_id]]
+        assert any(start <= event.timestamp.hour < end for start, end in pattern['active_hours'])
+
+    # 기대 횟수: 매 tick마다 _should_interact로 상호작용 여부를 정하는 시뮬레이션
+    expected = 0
+    current_time = start_time
+    end_time = start_time + timedelta(hours=duration_hours)
+    while current_time < end_time:
+        for device in simulator.devices.values():
+            expected += simulator._should_interact(current_time, simulator.users[device.user_id])
+        current_time += timedelta(minutes=random.randint(1, 5))
+
+    logging.info(f"Event scheduler: {len(events)} events, tick model: {expected}")
+    assert abs(len(events) - expected) / expected < tolerance, "Event rate differs from the tick model"
+
+
+# 같은 seed면 같은 결과, checkpoint에서 재개해도 끊김 없이 같은 이벤트가 나오는지 확인
+def test_checkpoint_resume(duration_hours=48, stop_after=500):
+    import tempfile
+    from itertools import islice
+
+    def build_simulator():
+        simulator = SmartHomeSimulator(verbose=False, seed=42)
+        for profile in ['Office Worker', 'Student', 'Family with Kids']:
+            user_id = simulator.add_user(profile)
+            simulator.add_device('Light', user_id)
+            simulator.add_device('Speaker', user_id)
+        return simulator
+
+    start_time = datetime(2024, 1, 1)
+    for scheduler in ['tick', 'event']:
+        full = [event.to_dict() for event in build_simulator().iter_events(start_time, duration_hours, scheduler)]
+        assert full == [event.to_dict() for event in build_simulator().iter_events(start_time, duration_hours, scheduler)]
+
+        simulator = build_simulator()
+        events = simulator.iter_events(start_time, duration_hours, scheduler)
+        head = [event.to_dict() for event in islice(events, stop_after)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'simulation.ckpt')
+            simulator.save_checkpoint(path)
+            # 저장한 checkpoint를 새 객체로 로드해서 이어서 실행
+            restored = SmartHomeSimulator.load_checkpoint(path)
+            tail = [event.to_dict() for event in restored.resume_events()]
+
+        assert head + tail == full, f"Resumed {scheduler} run differs from the uninterrupted run"
+        logging.info(f"{scheduler}: {len(full)} events reproduced, resumed after {stop_after}")
+
+# 두 번째 배치가 실패해도(이미 commit된 배치 뒤의 500) 재전송으로 중복 row가 생기지 않는지 확인
+def test_no_duplicates_after_partial_ingest_failure(batch_size=10, batches=3):
+    import tempfile
+    from types import SimpleNamespace
+    from sqlalchemy import text
+
+    db_dir = tempfile.mkdtemp()
+    os.environ['IOT_DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'iotlogs.db')}"
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    import backend.ingest as ingest
+    from backend.app import app
+    from backend.database import db
+    from log_api_handler import LogTransport
+
+    class FlaskSession:
+        """requests.Session stand-in that posts to the Flask test client"""
+        def __init__(self, client):
+            self.client = client
+            self.posts = 0
+
+        def post(self, url, data=None, headers=None, timeout=None):
+            self.posts += 1
+            response = self.client.post(url, data=data, headers=headers)
+            return SimpleNamespace(status_code=response.status_code, text=response.get_data(as_text=True),
+                                   headers=response.headers, json=lambda: response.get_json())
+
+        def close(self):
+            pass
+
+    simulator = SmartHomeSimulator(verbose=False, seed=7)
+    user_id = simulator.add_user('Student')
+    simulator.add_device('Light', user_id)
+    simulator.add_device('Speaker', user_id)
+    logs = [event.to_dict() for event in simulator.iter_events(datetime(2024, 1, 1), 24 * 7)][:batch_size * batches]
+
+    # 두 번째 배치의 commit만 실패시킴 (첫 배치는 이미 저장된 상태)
+    update_rollups = ingest.update_rollups
+    calls = []
+
+    def failing_update_rollups(session, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("simulated database error")
+        update_rollups(session, rows)
+
+    ingest.update_rollups = failing_update_rollups
+    try:
+        transport = LogTransport(url=f'/simulate/stream?batch_size={batch_size}', backoff=0)
+        transport.session = FlaskSession(app.test_client())
+        summary = transport.send(logs)
+        transport.close()
+    finally:
+        ingest.update_rollups = update_rollups
+
+    with app.app_context(), db.engine.connect() as conn:
+        rows = conn.execute(text("SELECT COUNT(*), COUNT(DISTINCT device_id || timestamp) FROM transactions")).one()
+
+    assert transport.session.posts == 1, "A chunk that failed after a committed batch was sent again"
+    assert summary['failed_chunks'] == 1 and summary['accepted'] == batch_size
+    assert rows[0] == rows[1] == batch_size, f"Expected {batch_size} unique rows, found {rows[0]} ({rows[1]} unique)"
+    logging.info(f"Partial ingest failure: {rows[0]} rows stored once, chunk not replayed")
+
+
+def test_oversized_values_rejected(count=5):
+    import json
+    import tempfile
+    from sqlalchemy import text
+
+    if 'backend.app' not in sys.modules:
+        db_dir = tempfile.mkdtemp()
+        os.environ['IOT_DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'iotlogs.db')}"
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from backend.app import app
+    from backend.database import db
+
+    simulator = SmartHomeSimulator(verbose=False, seed=11)
+    user_id = simulator.add_user('Student')
+    simulator.add_device('Light', user_id)
+    logs = [event.to_dict() for event in simulator.iter_events(datetime(2024, 2, 1), 24)][:count]
+    for log in logs:
+        log['timestamp'] = log['timestamp'].isoformat()
+    # SQLite does not enforce VARCHAR lengths, so these would be stored as-is without the check
+    logs[1]['state']['color'] = 'x' * 21
+    logs[2]['value'] = 'v' * 101
+
+    with app.app_context(), db.engine.connect() as conn:
+        before = conn.execute(text("SELECT COUNT(*) FROM transactions")).scalar()
+    body = ''.join(json.dumps(log) + '\n' for log in logs)
+    response = app.test_client().post('/simulate/stream', data=body, headers={"Content-Type": "application/x-ndjson"})
+    ingest = response.get_json()['ingest']
+    with app.app_context(), db.engine.connect() as conn:
+        stored = conn.execute(text("SELECT COUNT(*) FROM transactions")).scalar() - before
+
+    assert response.status_code == 200
+    assert ingest['accepted'] == stored == count - 2 and ingest['rejected'] == 2
+    logging.info(f"Oversized values: {ingest['rejected']} rows rejected, {stored} stored")
+
+
+def test_partition_backfill_cap(months_ahead=3, max_backfill=24):
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from backend.partitions import (initial_partitions, partition_definition, partition_upper_bound,
+                                    OLD_PARTITION, MAX_PARTITION)
+
+    assert partition_definition(datetime(2024, 12, 1)) == \
+        "PARTITION p202412 VALUES LESS THAN ('2025-01-01 00:00:00')"
+
+    # Recent data: one partition per month from the oldest row, nothing in p_old
+    current = datetime(2025, 3, 1)
+    definitions = initial_partitions(datetime(2024, 11, 15, 8, 30), current, months_ahead, max_backfill)
+    assert definitions[0] == partition_definition(datetime(2024, 11, 1))
+    assert len(definitions) == 5 + months_ahead + 1
+
+    # An outlier 1970 row must not create a partition per month since then
+    definitions = initial_partitions(datetime(1970, 1, 1), current, months_ahead, max_backfill)
+    assert definitions[0] == f"PARTITION {OLD_PARTITION} VALUES LESS THAN ('2023-03-01 00:00:00')"
+    assert definitions[1] == partition_definition(datetime(2023, 3, 1))
+    assert definitions[-2] == partition_definition(datetime(2025, 6, 1))
+    assert definitions[-1].startswith(f"PARTITION {MAX_PARTITION} ")
+    assert len(definitions) == 1 + max_backfill + 1 + months_ahead + 1
+
+    # p_old only expires once everything before the first monthly partition has
+    partitions = [OLD_PARTITION, 'p202303', 'p202304']
+    assert partition_upper_bound(partitions, 0) == datetime(2023, 3, 1)
+    assert partition_upper_bound(partitions, 1) == datetime(2023, 4, 1)
+    print(f"Partition backfill capped at {max_backfill} months: {len(definitions)} partitions for a 1970 row")
+
+
 if __name__ == "__main__":
     test_simulator()
+    test_vectorized_parity()
+    test_event_scheduler()
+    test_checkpoint_resume()
+    test_no_duplicates_after_partial_ingest_failure()
+    test_oversized_values_rejected()
+    test_partition_backfill_cap()
@@ -0,0 +1,246 @@
+# simulator/vectorized.py
+
+import numpy as np
+
+# Vocabularies used by the columnar output (codes index into these lists)
+from fleet import DEVICE_TYPES, POWER, MODES, COLORS
+
+ACTIONS = ['power', 'brightness', 'setMode', 'setColor', 'voice assistant']
+VOICE_VALUES = ['weather', 'news', 'time', 'joke', 'reminder', 'music']
+FUNCS = ['turnOn', 'turnOff', 'setBrightness', 'setMode', 'setColor'] + [f'get{v.capitalize()}' for v in VOICE_VALUES]
+# Event values: power/mode/color/voice strings followed by the brightness levels 0-100
+VALUES = POWER[::-1] + MODES + COLORS + VOICE_VALUES + list(range(0, 101))
+
+_ACTION = {name: code for code, name in enumerate(ACTIONS)}
+_FUNC = {name: code for code, name in enumerate(FUNCS)}
+_MODE_OFFSET = 2
+_COLOR_OFFSET = _MODE_OFFSET + len(MODES)
+_VOICE_OFFSET = _COLOR_OFFSET + len(COLORS)
+_BRIGHTNESS_OFFSET = _VOICE_OFFSET + len(VOICE_VALUES)
+
+# Same per-hour action weights as Light.generate_action (power, brightness, setMode, setColor)
+_LIGHT_WEIGHTS = np.empty((24, 4))
+for _hour in range(24):
+    if 6 <= _hour < 9:
+        _LIGHT_WEIGHTS[_hour] = [0.5, 0.3, 0.1, 0.1]
+    elif 17 <= _hour < 23:
+        _LIGHT_WEIGHTS[_hour] = [0.4, 0.3, 0.2, 0.1]
+    else:
+        _LIGHT_WEIGHTS[_hour] = [0.6, 0.2, 0.1, 0.1]
+_LIGHT_CUMULATIVE = np.cumsum(_LIGHT_WEIGHTS, axis=1) / _LIGHT_WEIGHTS.sum(axis=1, keepdims=True)
+
+# Upper bound on ticks x devices cells generated at once
+DEFAULT_CHUNK_CELLS = 1_000_000
+
+
+class ColumnarLogs:
+    """Simulation events as parallel NumPy arrays (one entry per event)"""
+
+    COLUMNS = ('timestamp', 'device_index', 'action', 'func', 'value',
+               'power', 'brightness', 'color', 'mode', 'volume')
+
+    def __init__(self, device_ids, user_ids, device_types, **columns):
+        # Per-device lookup tables (device_index points into these)
+        self.device_ids = device_ids
+        self.user_ids = user_ids
+        self.device_types = device_types
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def slice(self, begin, end):
+        """Events begin:end as a ColumnarLogs sharing the device lookup tables (views, no copy)"""
+        columns = {name: getattr(self, name)[begin:end] for name in self.COLUMNS}
+        return ColumnarLogs(self.device_ids, self.user_ids, self.device_types, **columns)
+
+    @classmethod
+    def concat(cls, chunks, device_ids, user_ids, device_types):
+        if not chunks:
+            columns = {name: np.empty(0, dtype='datetime64[us]' if name == 'timestamp' else np.uint8)
+                       for name in cls.COLUMNS}
+            return cls(device_ids, user_ids, device_types, **columns)
+        columns = {name: np.concatenate([getattr(chunk, name) for chunk in chunks]) for name in cls.COLUMNS}
+        return cls(device_ids, user_ids, device_types, **columns)
+
+    def counts(self):
+        """Number of events per (device_type, action, func)"""
+        keys = self.device_types[self.device_index].astype(np.int64) * 1000 + self.action.astype(np.int64) * 100 + self.func
+        unique, counts = np.unique(keys, return_counts=True)
+        return {
+            (DEVICE_TYPES[key // 1000], ACTIONS[key // 100 % 10], FUNCS[key % 100]): int(count)
+            for key, count in zip(unique, counts)
+        }
+
+    def to_logs(self):
+        """Convert to the list-of-dicts format produced by SmartHomeSimulator.simulate"""
+        logs = []
+        timestamps = self.timestamp.astype('datetime64[us]').tolist()
+        for i in range(len(self)):
+            device = self.device_index[i]
+            device_type = DEVICE_TYPES[self.device_types[device]]
+            if device_type == 'Light':
+                state = {
+                    'power': POWER[self.power[i]],
+                    'brightness': int(self.brightness[i]),
+                    'color': COLORS[self.color[i]],
+                    'mode': MODES[self.mode[i]]
+                }
+            else:
+                state = {
+                    'power': POWER[self.power[i]],
+                    'volume': int(self.volume[i]),
+                    'mode': MODES[self.mode[i]]
+                }
+            logs.append({
+                'device_type': device_type,
+                'device_id': self.device_ids[device],
+                'user_id': self.user_ids[device],
+                'action': ACTIONS[self.action[i]],
+                'value': VALUES[self.value[i]],
+                'func': FUNCS[self.func[i]],
+                'timestamp': timestamps[i],
+                'state': state
+            })
+        return logs
+
+
+def _tick_offsets(rng, duration_minutes):
+    """Minute offsets of every tick: 0, then steps of 1-5 minutes while before the end"""
+    steps = []
+    total = 0
+    while total < duration_minutes:
+        draw = rng.integers(1, 6, size=max(16, int((duration_minutes - total) / 3 * 1.1)))
+        steps.append(draw)
+        total += int(draw.sum())
+    offsets = np.concatenate([[0], np.cumsum(np.concatenate(steps))])
+    return offsets[offsets < duration_minutes]
+
+
+def _forward_fill(mask, values, carry):
+    """Running value along axis 0: last value where mask was set, else the carried-in state"""
+    ticks = np.arange(mask.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(mask, ticks, -1), axis=0)
+    filled = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    return np.where(last >= 0, filled, carry[None, :])
+
+
+class VectorizedSimulator:
+    """
+    NumPy engine equivalent to SmartHomeSimulator.simulate: on every tick every device
+    performs one action drawn with the same weights as Light/Speaker.generate_action.
+    """
+
+    def __init__(self, simulator, seed=None):
+        self.simulator = simulator
+        self.rng = np.random.default_rng(seed)
+
+        devices = list(simulator.devices.values())
+        self.devices = devices
+        self.device_ids = np.array([d.device_id for d in devices], dtype=object)
+        self.user_ids = np.array([d.user_id for d in devices], dtype=object)
+
+        # Current device state, gathered from the fleet columns (codes share the fleet vocabularies)
+        self.fleet = simulator.fleet
+        self.indices = np.array([d.index for d in devices], dtype=np.int64)
+        self.device_types = self.fleet.device_type[self.indices]
+        self.is_light = self.device_types == DEVICE_TYPES.index('Light')
+        self.power = self.fleet.power[self.indices]
+        self.brightness = self.fleet.brightness[self.indices]
+        self.color = self.fleet.color[self.indices]
+        self.mode = self.fleet.mode[self.indices]
+        self.volume = self.fleet.volume[self.indices]
+
+    def _step_chunk(self, start_time, offsets):
+        rng = self.rng
+        n_ticks, n_devices = len(offsets), len(self.devices)
+        timestamps = np.datetime64(start_time, 'us') + offsets.astype('timedelta64[m]')
+        hours = (start_time.hour * 60 + start_time.minute + offsets) // 60 % 24
+
+        # Light actions: inverse CDF over the per-hour weights
+        draws = rng.random((n_ticks, n_devices))
+        light_action = (draws[:, :, None] >= _LIGHT_CUMULATIVE[hours][:, None, :3]).sum(axis=2)
+        # Speaker actions: power or voice assistant with equal probability
+        speaker_action = np.where(draws < 0.5, _ACTION['power'], _ACTION['voice assistant'])
+        action = np.where(self.is_light[None, :], light_action, speaker_action).astype(np.uint8)
+
+        # Power toggles on every power action
+        is_power = action == _ACTION['power']
+        power = ((self.power[None, :] + np.cumsum(is_power, axis=0)) % 2).astype(np.uint8)
+
+        new_brightness = rng.integers(0, 101, size=(n_ticks, n_devices)).astype(np.uint8)
+        new_mode = rng.integers(0, len(MODES), size=(n_ticks, n_devices)).astype(np.uint8)
+        new_color = rng.integers(0, len(COLORS), size=(n_ticks, n_devices)).astype(np.uint8)
+        new_voice = rng.integers(0, len(VOICE_VALUES), size=(n_ticks, n_devices)).astype(np.uint8)
+
+        is_brightness = action == _ACTION['brightness']
+        is_mode = action == _ACTION['setMode']
+        is_color = action == _ACTION['setColor']
+        is_voice = action == _ACTION['voice assistant']
+
+        brightness = _forward_fill(is_brightness, new_brightness, self.brightness)
+        mode = _forward_fill(is_mode, new_mode, self.mode)
+        color = _forward_fill(is_color, new_color, self.color)
+        volume = np.broadcast_to(self.volume, (n_ticks, n_devices))
+
+        func = np.select(
+            [is_power & (power == 1), is_power, is_brightness, is_mode, is_color],
+            [_FUNC['turnOn'], _FUNC['turnOff'], _FUNC['setBrightness'], _FUNC['setMode'], _FUNC['setColor']],
+            default=_FUNC['getWeather'] + new_voice.astype(np.int64)
+        ).astype(np.uint8)
+        value = np.select(
+            [is_power, is_brightness, is_mode, is_color],
+            [1 - power.astype(np.int64), _BRIGHTNESS_OFFSET + new_brightness.astype(np.int64),
+             _MODE_OFFSET + new_mode.astype(np.int64), _COLOR_OFFSET + new_color.astype(np.int64)],
+            default=_VOICE_OFFSET + new_voice.astype(np.int64)
+        ).astype(np.uint8)
+
+        # Carry the final state into the next chunk
+        self.power, self.brightness, self.mode, self.color = power[-1], brightness[-1], mode[-1], color[-1]
+
+        return ColumnarLogs(
+            self.device_ids, self.user_ids, self.device_types,
+            timestamp=np.repeat(timestamps, n_devices),
+            device_index=np.tile(np.arange(n_devices, dtype=np.int32), n_ticks),
+            action=action.ravel(),
+            func=func.ravel(),
+            value=value.ravel(),
+            power=power.ravel(),
+            brightness=brightness.ravel(),
+            color=color.ravel(),
+            mode=mode.ravel(),
+            volume=volume.ravel()
+        )
+
+    def iter_chunks(self, start_time, duration_hours, chunk_cells=DEFAULT_CHUNK_CELLS):
+        """
+        Generate events chunk by chunk so memory stays bounded for long runs
+        :param start_time: Simulation start (datetime)
+        :param duration_hours: Simulated duration in hours
+        :param chunk_cells: Maximum ticks x devices per chunk
+        :return: Generator of ColumnarLogs in timestamp order
+        """
+        if not self.devices:
+            return
+        offsets = _tick_offsets(self.rng, duration_hours * 60)
+        chunk_ticks = max(1, chunk_cells // len(self.devices))
+        for begin in range(0, len(offsets), chunk_ticks):
+            yield self._step_chunk(start_time, offsets[begin:begin + chunk_ticks])
+        self.write_back()
+
+    def simulate(self, start_time, duration_hours, chunk_cells=DEFAULT_CHUNK_CELLS):
+        """
+        Run the whole simulation
+        :return: ColumnarLogs with every event
+        """
+        chunks = list(self.iter_chunks(start_time, duration_hours, chunk_cells))
+        return ColumnarLogs.concat(chunks, self.device_ids, self.user_ids, self.device_types)
+
+    def write_back(self):
+        """Copy the final array state back into the fleet"""
+        lights = self.indices[self.is_light]
+        self.fleet.power[self.indices] = self.power
+        self.fleet.brightness[lights] = self.brightness[self.is_light]
+        self.fleet.color[lights] = self.color[self.is_light]
+        self.fleet.mode[lights] = self.mode[self.is_light]